@@ -1,3 +1,4 @@
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -5,11 +6,268 @@ from io import StringIO
 import plotly.express as px
 import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy.stats import zscore
+from profiling import (frame_fingerprint, profile_column, profile_frame, summary_statistics, missing_values,
+                       unique_values)
+from preview import (COLUMN_PAGE_SIZE, PAGE_SIZES, matching_columns, page_count, preview_page, preview_rows)
+from ingestion import read_csv_chunked
+from excel_ingestion import list_sheets, read_excel_sheets, combine_sheets
+from type_inference import SAMPLE_SIZE, NUMERIC_THRESHOLD
+from cleaning import describe_step, fill_value
+from memory_optimization import LOSSY_DTYPES, optimization_report
+from pipeline import CleaningHistory, load_recipe, replay, schema_mismatches
+from export import EXPORT_FORMATS, export_path
+from outliers import APPROX_SAMPLE_ROWS, OUTLIER_METHODS, outlier_statistics, outlier_counts
+from correlation import ANNOTATE_MAX_COLUMNS, correlation_matrix, top_pairs, cluster_order
+from shared_store import SharedDatasetStore, content_hash, memory_report
+from instrumentation import (LOG_PATH, RerunProfiler, RerunTimer, available_profilers, log_record,
+                             step_record)
+from charts import (MAX_POINTS, MAX_PAIR_COLUMNS, stratified_sample, density_grid, numeric_column_stats,
+                    category_counts, render_histogram, render_box, render_violin, render_category_counts)
+
+# Cleaning steps return new frames that share unchanged columns with the old
+# one; copy-on-write keeps those shared columns safe to hold for undo
+pd.set_option("mode.copy_on_write", True)
+
+# Uploads larger than this are read in large file mode by default
+LARGE_FILE_BYTES = 100 * 1024 * 1024
+
+OUTLIER_METHOD_LABELS = {"IQR": "iqr", "Z-Score": "zscore", "Modified Z-Score (MAD)": "modified_zscore"}
+
+# Bulk imputation choices -> impute_missing methods
+IMPUTE_STRATEGIES = {"none": None, "mean": "mean", "median": "median", "mode": "mode", "constant": "value",
+                     "forward fill": "ffill", "backward fill": "bfill"}
+
+# Cleaning steps kept in the diagnostics panel
+RECENT_STEP_RECORDS = 20
+
+
+def mark_df_changed():
+    # Call after any step that may have modified st.session_state.df
+    st.session_state.df_version = None
+
+
+def dataset_version():
+    # Content fingerprint of the current DataFrame, recomputed lazily after a change
+    if st.session_state.get("df_version") is None:
+        st.session_state.df_version = frame_fingerprint(st.session_state.df)
+    return st.session_state.df_version
+
+
+@st.cache_data(max_entries=8, show_spinner="Profiling columns...")
+def cached_profile(_df, version):
+    # Keyed on the content fingerprint only; _df is not hashed by Streamlit
+    return profile_frame(_df)
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_column_profile(_df, version, column):
+    # One column's profile, for the details the user opened
+    return profile_column(_df[column])
+
+
+@st.cache_data(max_entries=8, show_spinner="Sorting and filtering...")
+def cached_preview_rows(_df, version, sort_column, ascending, filter_column, filter_text):
+    return preview_rows(_df, sort_column, ascending, filter_column, filter_text)
+
+
+def page_selector(label, pages, key):
+    # Page number input that falls back to page 1 when the page count shrinks
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = 1
+    return st.number_input(f"{label} (of {pages:,}):", min_value=1, max_value=pages, step=1, key=key)
+
+
+@st.cache_data(max_entries=8, show_spinner="Measuring column memory...")
+def cached_optimization_report(_df, version):
+    return optimization_report(_df)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_sample(_df, version, columns, max_points):
+    return stratified_sample(_df, columns, max_points)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_density(_df, version, x_column, y_column):
+    return density_grid(_df[x_column], _df[y_column])
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_column_stats(_df, version, column):
+    return numeric_column_stats(_df[column])
+
+
+@st.cache_data(max_entries=64, show_spinner="Rendering chart...")
+def cached_chart(_df, version, column, chart):
+    # PNG bytes of a chart, rendered once per dataset version and column
+    if chart == "Value Distribution":
+        return render_category_counts(category_counts(_df[column]), column)
+    stats = cached_column_stats(_df, version, column)
+    if stats is None:
+        return None
+    renderers = {"Histogram": render_histogram, "Box Plot": render_box, "Violin Plot": render_violin}
+    return renderers[chart](stats, column)
+
+
+@st.cache_data(max_entries=8, show_spinner="Computing correlations...")
+def cached_correlation(_df, version, columns, method):
+    return correlation_matrix(_df, columns, method)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_outlier_statistics(_df, version, columns, approximate):
+    return outlier_statistics(_df, columns, approximate=approximate)
+
+
+@st.cache_data(max_entries=16, show_spinner="Detecting outliers...")
+def cached_outlier_counts(_df, version, columns, approximate, method, threshold):
+    # Counts for all methods, the selected one with the chosen threshold
+    stats = cached_outlier_statistics(_df, version, columns, approximate)
+    counts = outlier_counts(_df, stats, {method: threshold})
+    return counts[[method] + [other for other in counts.columns if other != method]]
+
+
+@st.cache_resource
+def shared_store():
+    # One store per server process: sessions uploading the same file share its frame
+    return SharedDatasetStore()
+
+
+def session_memory_report():
+    # Kept per session rather than in st.cache_data: the shared/private split
+    # depends on this session's column buffers and on what the store holds now,
+    # so it is recomputed when the data changes or the stored base is evicted
+    # or replaced.
+    store = shared_store()
+    base_key = st.session_state.base_key
+    base = store.get(base_key)
+    key = (dataset_version(), base_key, id(base) if base is not None else None)
+    if st.session_state.get("memory_report_key") != key:
+        st.session_state.memory_report = memory_report(st.session_state.df, base, store.column_bytes(base_key))
+        st.session_state.memory_report_key = key
+    return st.session_state.memory_report
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_sheet_list(_file, file_hash, filename):
+    return list_sheets(_file, filename)
+
+
+def apply_cleaning_step(step, message=None, rerun=True, skip_unchanged=False):
+    # Apply a cleaning step exactly once and record it in the history.
+    # message may use {initial_rows} and {final_rows}; it is shown after the rerun.
+    # With skip_unchanged, a step that changes nothing is neither recorded nor rerun.
+    before = st.session_state.df
+    initial_rows = len(before)
+    started = time.perf_counter()
+    after = st.session_state.history.apply(before, step, skip_unchanged=skip_unchanged)
+    if after is before:
+        return
+    st.session_state.df = after
+    if st.session_state.get("diagnostics"):
+        record = step_record(describe_step(step), time.perf_counter() - started, before, st.session_state.df)
+        log_record(record)
+        recent = st.session_state.get("step_records", []) + [record]
+        st.session_state.step_records = recent[-RECENT_STEP_RECORDS:]
+    st.session_state.cleaned = True
+    mark_df_changed()
+    if message:
+        st.session_state.cleaning_message = message.format(
+            initial_rows=initial_rows, final_rows=len(st.session_state.df)
+        )
+    if rerun:
+        st.rerun()
+
+
+def show_cleaning_history():
+    history = st.session_state.history
+    with st.sidebar.expander(f"Cleaning History ({len(history.steps)} steps)"):
+        for number, description in enumerate(history.descriptions(), start=1):
+            st.text(f"{number}. {description}")
+
+        undo_column, redo_column = st.columns(2)
+        if undo_column.button("Undo", disabled=not history.can_undo):
+            st.session_state.df = history.undo(st.session_state.df)
+            mark_df_changed()
+            st.rerun()
+        if redo_column.button("Redo", disabled=not history.can_redo):
+            st.session_state.df = history.redo(st.session_state.df)
+            mark_df_changed()
+            st.rerun()
+
+        st.download_button(
+            label="Export Recipe",
+            data=history.to_json(),
+            file_name="cleaning_recipe.json",
+            mime="application/json",
+            disabled=not history.steps
+        )
+
+        recipe_file = st.file_uploader("Replay a recipe on this dataset:", type=["json"])
+        if recipe_file is not None and st.button("Replay Recipe"):
+            recipe = load_recipe(recipe_file.getvalue())
+            for problem in schema_mismatches(st.session_state.df, recipe):
+                st.warning(f"Recipe schema differs: {problem}")
+            # Frame and history are replaced together, only once every step has succeeded
+            st.session_state.df, st.session_state.history = replay(st.session_state.df, recipe, history)
+            st.session_state.cleaned = True
+            mark_df_changed()
+            st.session_state.cleaning_message = f"Replayed {len(recipe['steps'])} cleaning steps."
+            st.rerun()
+
+
+def begin_rerun():
+    # A run cut short by st.rerun() never reached finish_rerun(); close it first
+    finish_rerun(interrupted=True)
+    timer = RerunTimer(enabled=st.session_state.get("diagnostics", False))
+    st.session_state.rerun_timer = timer
+    profiler_kind = st.session_state.pop("profile_next", None)
+    if profiler_kind:
+        st.session_state.rerun_profiler = RerunProfiler(profiler_kind)
+        st.session_state.rerun_profiler.start()
+    return timer
+
+
+def finish_rerun(interrupted=False):
+    timer = st.session_state.pop("rerun_timer", None)
+    profiler = st.session_state.pop("rerun_profiler", None)
+    if profiler is not None:
+        st.session_state.profile_report = profiler.stop()
+    if timer is not None and timer.enabled:
+        record = timer.record(interrupted=interrupted)
+        st.session_state.last_rerun = record
+        log_record(record)
+
+
+def show_diagnostics():
+    with st.sidebar.expander("Performance Diagnostics"):
+        st.checkbox("Record stage timings and memory", key="diagnostics")
+        record = st.session_state.get("last_rerun")
+        if st.session_state.diagnostics and record:
+            st.markdown(f"**Last rerun**: {record['total_s'] * 1000:.0f} ms")
+            stages = pd.DataFrame(record["stages"], columns=["stage", "seconds"])
+            st.dataframe(stages.assign(ms=stages["seconds"] * 1000).drop(columns="seconds"), hide_index=True)
+        step_records = st.session_state.get("step_records")
+        if st.session_state.diagnostics and step_records:
+            st.markdown("**Cleaning steps**")
+            st.dataframe(pd.DataFrame(step_records).drop(columns="type"), hide_index=True)
+        st.caption(f"Records are appended to {LOG_PATH}")
+
+        profiler_kind = st.selectbox("Profiler:", available_profilers())
+        if st.button("Profile one rerun"):
+            st.session_state.profile_next = profiler_kind
+            st.rerun()
+        report = st.session_state.get("profile_report")
+        if report:
+            st.download_button("Download Profile", report, file_name="rerun_profile.txt", mime="text/plain")
+            st.code(report, language=None)
 
 # App title
 st.title("Data Analysis and Cleaning with Streamlit")
 
+# Stage timings of this run (only recorded while diagnostics are switched on)
+timer = begin_rerun()
+
 # File uploader
 uploaded_file = st.file_uploader("Upload a Dataset (CSV or Excel)", type=["csv", "xlsx", "xls"])
 
@@ -18,15 +276,98 @@ if "df" not in st.session_state:
     st.session_state.df = None
 if "cleaned" not in st.session_state:
     st.session_state.cleaned = False
+if "df_version" not in st.session_state:
+    st.session_state.df_version = None
+timer.lap("Upload widget")
 
 if uploaded_file is not None:
     try:
+        # Hash the upload once per file; a new file replaces the current dataset
+        upload_id = getattr(uploaded_file, "file_id", uploaded_file.name)
+        if st.session_state.get("upload_id") != upload_id:
+            st.session_state.upload_id = upload_id
+            st.session_state.upload_hash = content_hash(uploaded_file)
+            st.session_state.df = None
+
+        # Ingestion options for large CSV files
+        if uploaded_file.name.endswith(".csv"):
+            with st.sidebar.expander("Upload Options"):
+                large_file_mode = st.checkbox(
+                    "Large file mode (chunked reading, compact data types)",
+                    value=uploaded_file.size > LARGE_FILE_BYTES
+                )
+                downcast_floats = st.checkbox(
+                    "Store decimal numbers as float32 (halves their memory, keeps about 7 significant digits)",
+                    value=False,
+                    disabled=not large_file_mode
+                )
+                # The limits and sampling only apply to chunked reading
+                row_limit = st.number_input(
+                    "Row limit (0 = all rows):", min_value=0, value=0, step=100000, disabled=not large_file_mode
+                )
+                byte_limit_mb = st.number_input(
+                    "Read only the first N MB (0 = whole file):", min_value=0, value=0, disabled=not large_file_mode
+                )
+                sample_percent = st.slider("Sample of rows to keep (%):", 1, 100, 100, disabled=not large_file_mode)
+                sample_seed = st.number_input("Sampling seed:", min_value=0, value=42, disabled=not large_file_mode)
+                if st.button("Reload with these options"):
+                    st.session_state.df = None
+        else:
+            # Sheets and their sizes, listed without parsing any cells
+            sheets = cached_sheet_list(uploaded_file, st.session_state.upload_hash, uploaded_file.name)
+            sheet_names = [sheet["sheet"] for sheet in sheets]
+            with st.sidebar.expander("Upload Options"):
+                st.dataframe(pd.DataFrame(sheets), hide_index=True)
+                selected_sheets = st.multiselect(
+                    "Sheets to load (several are stacked with a 'Sheet' column):",
+                    sheet_names,
+                    default=sheet_names[:1]
+                )
+                if st.button("Reload with these options", disabled=not selected_sheets):
+                    st.session_state.df = None
+            selected_sheets = selected_sheets or sheet_names[:1]
+
         # Load the dataset into session state if not already loaded
         if st.session_state.df is None:
+            def load_dataset():
+                if uploaded_file.name.endswith(".csv"):
+                    if large_file_mode:
+                        progress_bar = st.progress(0.0, text="Reading file...")
+                        df = read_csv_chunked(
+                            uploaded_file,
+                            max_rows=row_limit or None,
+                            max_bytes=byte_limit_mb * 1024 * 1024 or None,
+                            sample_fraction=sample_percent / 100 if sample_percent < 100 else None,
+                            seed=sample_seed,
+                            downcast_floats=downcast_floats,
+                            progress=lambda fraction, message: progress_bar.progress(fraction, text=message)
+                        )
+                        progress_bar.empty()
+                        return df
+                    return pd.read_csv(uploaded_file)
+                # Sheets parsed before are read back from their Parquet sidecar
+                frames = read_excel_sheets(uploaded_file, selected_sheets, st.session_state.upload_hash)
+                return combine_sheets(frames)
+
+            # The parsed file is held once per process, keyed by its content and
+            # the ingestion options. The session works on a shallow copy: with
+            # copy-on-write, cleaning steps only allocate the columns they change.
             if uploaded_file.name.endswith(".csv"):
-                st.session_state.df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith((".xlsx", ".xls")):
-                st.session_state.df = pd.read_excel(uploaded_file)
+                # Options that only apply in large file mode stay out of the key otherwise,
+                # so changing them does not load the same data again
+                if large_file_mode:
+                    options = (True, row_limit, byte_limit_mb, sample_percent, sample_seed, downcast_floats)
+                else:
+                    options = (False,)
+            else:
+                options = tuple(selected_sheets)
+            base_key = (st.session_state.upload_hash, uploaded_file.name.rsplit(".", 1)[-1], options)
+            base = shared_store().get_or_load(base_key, load_dataset)
+            st.session_state.base_key = base_key
+            st.session_state.df = base.copy(deep=False)
+            st.session_state.history = CleaningHistory(st.session_state.df)
+            mark_df_changed()
+        timer.lap("Load dataset")
 
         # Sidebar options for main sections
         st.sidebar.title("Options")
@@ -35,6 +376,11 @@ if uploaded_file is not None:
             ["Data Show", "Cleaning", "Outliers Detection", "Visualization and Correlations"]
         )
 
+        # Result of the cleaning step applied on the previous run
+        cleaning_message = st.session_state.pop("cleaning_message", None)
+        if cleaning_message:
+            st.success(cleaning_message)
+
         # Section 1: Data Show
         if section == "Data Show":
             st.sidebar.subheader("Data Show Options")
@@ -48,8 +394,32 @@ if uploaded_file is not None:
 
             if data_option == "Preview Data":
                 st.header("Preview Data")
-                num_rows = st.sidebar.slider("Select the number of rows to display:", 1, len(st.session_state.df), 5)
-                st.dataframe(st.session_state.df.head(num_rows))
+                columns = st.session_state.df.columns.tolist()
+                with st.sidebar.expander("Preview Options"):
+                    page_size = st.selectbox("Rows per page:", PAGE_SIZES)
+                    sort_column = st.selectbox("Sort by:", [None] + columns, format_func=lambda c: "(file order)" if c is None else c)
+                    ascending = st.radio("Order:", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+                    filter_column = st.selectbox("Filter column:", [None] + columns, format_func=lambda c: "(no filter)" if c is None else c)
+                    filter_text = st.text_input("Filter value (text contains, or e.g. '>= 10' for numbers and dates):")
+
+                # Sorting and filtering run on the server; only the current page is sent
+                try:
+                    positions = cached_preview_rows(
+                        st.session_state.df, dataset_version(), sort_column, ascending, filter_column, filter_text
+                    )
+                except ValueError as error:
+                    st.warning(str(error))
+                    positions = cached_preview_rows(st.session_state.df, dataset_version(), sort_column, ascending, None, "")
+                page = page_selector("Page", page_count(len(positions), page_size), "preview_page")
+                st.dataframe(preview_page(st.session_state.df, positions, page, page_size))
+                first_row = (page - 1) * page_size
+                if len(positions):
+                    st.caption(
+                        f"Rows {first_row + 1:,}–{min(first_row + page_size, len(positions)):,} of {len(positions):,}"
+                        + (f" (filtered from {len(st.session_state.df):,})" if len(positions) < len(st.session_state.df) else "")
+                    )
+                else:
+                    st.caption("No rows match the filter.")
 
             elif data_option == "Columns Info":
                 st.header("Columns and Data Types")
@@ -66,38 +436,47 @@ if uploaded_file is not None:
 
             elif data_option == "Summary Statistics":
                 st.header("Summary Statistics")
-                st.write(st.session_state.df.describe(include='all'))
+                profile = cached_profile(st.session_state.df, dataset_version())
+                st.write(summary_statistics(profile))
 
             elif data_option == "Missing Values per Column":
                 st.header("Missing Values per Column")
-                missing_values = st.session_state.df.isnull().sum()
-                st.write(missing_values)
+                profile = cached_profile(st.session_state.df, dataset_version())
+                st.write(missing_values(profile))
 
             elif data_option == "Unique Values per Column":
                 st.header("Unique Values per Column")
-                unique_values = st.session_state.df.nunique()
-                st.write(unique_values)
+                profile = cached_profile(st.session_state.df, dataset_version())
+                st.write(unique_values(profile))
 
             elif data_option == "Detailed Column Information":
                 st.header("Detailed Column Information")
-                for column in st.session_state.df.columns:
-                    st.subheader(f"**{column}**")
-                    column_data = st.session_state.df[column]
-                    st.markdown(f"- **Data Type**: {column_data.dtype}")
-                    st.markdown(f"- **Number of Missing Values**: {column_data.isnull().sum()}")
-                    st.markdown(f"- **Number of Unique Values**: {column_data.nunique()}")
-                    st.markdown(f"- **Value Distribution**: {column_data.value_counts().head()}")
-                    st.markdown(f"- **Example Values**: {column_data.head().to_list()}")
+                query = st.text_input("Search columns:")
+                columns = matching_columns(st.session_state.df, query)
+                page = page_selector("Page", page_count(len(columns), COLUMN_PAGE_SIZE), "column_page")
+                first_column = (page - 1) * COLUMN_PAGE_SIZE
+                st.caption(f"{len(columns):,} of {len(st.session_state.df.columns):,} columns")
+
+                # Statistics are only computed for the columns whose details are shown
+                for position, column in enumerate(columns[first_column:first_column + COLUMN_PAGE_SIZE], start=first_column):
+                    dtype = st.session_state.df[column].dtype
+                    if not st.toggle(f"**{column}** ({dtype})", key=f"column_details_{position}_{column}"):
+                        continue
+                    info = cached_column_profile(st.session_state.df, dataset_version(), column)
+                    st.markdown(f"- **Data Type**: {info['dtype']}")
+                    st.markdown(f"- **Number of Missing Values**: {info['null_count']}")
+                    st.markdown(f"- **Number of Unique Values**: {info['unique']}")
+                    st.markdown(f"- **Value Distribution**: {info['top_values']}")
+                    st.markdown(f"- **Example Values**: {info['examples']}")
                     st.markdown("---")
 
             elif data_option == "Value Distribution per Column":
                 st.header("Value Distribution per Column")
                 column_to_plot = st.sidebar.selectbox("Select a column to visualize:", st.session_state.df.columns.tolist())
                 st.header(f"Value Distribution of {column_to_plot}")
-                if st.session_state.df[column_to_plot].dtype == 'object':
-                    fig = plt.figure(figsize=(10, 6))
-                    sns.countplot(y=st.session_state.df[column_to_plot], palette="Set2")
-                    st.pyplot(fig)
+                column_dtype = st.session_state.df[column_to_plot].dtype
+                if column_dtype == 'object' or isinstance(column_dtype, (pd.CategoricalDtype, pd.StringDtype)):
+                    st.image(cached_chart(st.session_state.df, dataset_version(), column_to_plot, "Value Distribution"))
                 else:
                     st.warning("Please select a categorical column for this option.")
 
@@ -107,48 +486,39 @@ if uploaded_file is not None:
             with st.sidebar.expander("Choose a Cleaning Option:"):
                 cleaning_option = st.radio(
                     "Select a Cleaning Option:",
-                    ["Clean Column ", "Remove Duplicates", "Handle Missing Values", 
-                     "Remove Columns", "Drop Rows with Missing Values"]
+                    ["Clean Column ", "Remove Duplicates", "Handle Missing Values", "Bulk Imputation",
+                     "Remove Columns", "Drop Rows with Missing Values", "Optimize Memory"]
                 )
 
+            show_cleaning_history()
+
             if cleaning_option == "Clean Column ":
                 st.header("Step 1: Cleaning Column")
-                original_columns = st.session_state.df.columns.tolist()
-
-                # Clean column names
-                st.session_state.df.columns = (
-                    st.session_state.df.columns
-                    .str.strip()
-                    .str.replace(r"\s+", "_", regex=True)
-                    .str.replace(r"[^a-zA-Z0-9_]", "")
-                    .str.lower()
-                    .str.replace(r"^(?=\d)", "_", regex=True)
-                )
-
-                cleaned_columns = st.session_state.df.columns.tolist()
-                if original_columns != cleaned_columns:
-                    st.write("Column names have been cleaned:")
-                    for original, cleaned in zip(original_columns, cleaned_columns):
-                        if original != cleaned:
-                            st.write(f"- **{original}** → **{cleaned}**")
-                else:
-                    st.write("Column names are already clean.")
-
-                # Clean column values
-                for column in st.session_state.df.columns:
-                    if st.session_state.df[column].dtype == 'object':
-                        st.session_state.df[column] = st.session_state.df[column].str.lower()
 
-                    if pd.api.types.is_categorical_dtype(st.session_state.df[column]) or st.session_state.df[column].dtype == 'object':
-                        num_numeric_values = st.session_state.df[column].apply(pd.to_numeric, errors='coerce').notna().sum()
-                        total_values = len(st.session_state.df[column])
-                        numeric_percentage = num_numeric_values / total_values * 100
-
-                        if numeric_percentage > 70:
-                            st.session_state.df[column] = pd.to_numeric(st.session_state.df[column], errors='coerce')
-
-                st.success("Column names and values have been cleaned.")
-                st.session_state.cleaned = True  # Mark as cleaned
+                # Clean column names and values: text columns get their type inferred from a sample
+                with st.sidebar.expander("Type Inference Settings"):
+                    numeric_threshold = st.slider(
+                        "Share of parseable values needed to convert a column (%):", 50, 100, int(NUMERIC_THRESHOLD * 100)
+                    )
+                    sample_size = st.number_input("Values sampled per column:", min_value=100, value=SAMPLE_SIZE, step=1000)
+
+                if st.button("Clean Column Names and Values"):
+                    original_columns = st.session_state.df.columns.tolist()
+                    original_dtypes = st.session_state.df.dtypes
+                    apply_cleaning_step({"op": "clean_column_names"}, rerun=False, skip_unchanged=True)
+                    apply_cleaning_step(
+                        {"op": "clean_values", "numeric_threshold": numeric_threshold / 100, "sample_size": int(sample_size)},
+                        rerun=False, skip_unchanged=True
+                    )
+                    changes = [
+                        f"- **{original}** → **{cleaned}** ({st.session_state.df[cleaned].dtype})"
+                        for original, cleaned, dtype in zip(original_columns, st.session_state.df.columns, original_dtypes)
+                        if original != cleaned or st.session_state.df[cleaned].dtype != dtype
+                    ]
+                    st.session_state.cleaning_message = "Column names and values have been cleaned."
+                    if changes:
+                        st.session_state.cleaning_message += "\n\n" + "\n".join(changes)
+                    st.rerun()
 
                 # Add option to rename a column
                 st.sidebar.subheader("Rename a Column")
@@ -156,9 +526,11 @@ if uploaded_file is not None:
                     "Select a column to rename:", st.session_state.df.columns.tolist()
                 )
                 new_name = st.sidebar.text_input(f"Enter the new name for column '{column_to_rename}':")
-                if new_name and new_name != column_to_rename:
-                    st.session_state.df = st.session_state.df.rename(columns={column_to_rename: new_name})
-                    st.success(f"Column '{column_to_rename}' renamed to '{new_name}'.")
+                if st.sidebar.button("Rename Column") and new_name and new_name != column_to_rename:
+                    apply_cleaning_step(
+                        {"op": "rename_column", "column": column_to_rename, "new_name": new_name},
+                        f"Column '{column_to_rename}' renamed to '{new_name}'."
+                    )
 
                 # Add option to convert a column's data type
                 st.sidebar.subheader("Convert Data Type")
@@ -167,28 +539,26 @@ if uploaded_file is not None:
                 )
                 new_data_type = st.sidebar.selectbox(
                     f"Select the new data type for column '{column_to_convert}':",
-                    ["int", "float", "str", "bool"]
+                    ["int", "float", "str", "bool", "category", "string[pyarrow]", "Int64", "float32"]
                 )   
                 
                 if st.sidebar.button("Convert Data Type"):
                     try:
                         # Convert the column's data type
-                       st.session_state.df[column_to_convert] = st.session_state.df[column_to_convert].astype(new_data_type)
-                       st.success(f"Data type of column '{column_to_convert}' converted to '{new_data_type}'.")
+                        apply_cleaning_step(
+                            {"op": "convert_dtype", "column": column_to_convert, "dtype": new_data_type},
+                            f"Data type of column '{column_to_convert}' converted to '{new_data_type}'."
+                        )
                     except Exception as e:
                         st.error(f"Error converting data type of column '{column_to_convert}': {e}")
-            
-            
- 
- 
 
             elif cleaning_option == "Remove Duplicates":
                 st.header("Remove Duplicate Rows")
-                initial_rows = len(st.session_state.df)
-                st.session_state.df = st.session_state.df.drop_duplicates()
-                final_rows = len(st.session_state.df)
-                st.success(f"Duplicate rows removed. Rows reduced from {initial_rows} to {final_rows}.")
-                st.session_state.cleaned = True  # Mark as cleaned
+                if st.button("Remove Duplicate Rows"):
+                    apply_cleaning_step(
+                        {"op": "drop_duplicates"},
+                        "Duplicate rows removed. Rows reduced from {initial_rows} to {final_rows}."
+                    )
 
             elif cleaning_option == "Handle Missing Values":
                 st.header("Handle Missing Values")
@@ -210,40 +580,31 @@ if uploaded_file is not None:
 
                         if fill_method_numeric == "Do Nothing":
                             st.info(f"No missing value filling action selected for column '{column_to_fill_numeric}'.")
-                        
-                        elif fill_method_numeric == "Fill with Mean":
-                            mean_value = st.session_state.df[column_to_fill_numeric].mean()
-                            st.session_state.df[column_to_fill_numeric] = st.session_state.df[column_to_fill_numeric].fillna(mean_value)
-                            st.success(f"Missing values in column '{column_to_fill_numeric}' filled with the mean ({mean_value}).")
-
-                        elif fill_method_numeric == "Fill with Median":
-                            median_value = st.session_state.df[column_to_fill_numeric].median()
-                            st.session_state.df[column_to_fill_numeric] = st.session_state.df[column_to_fill_numeric].fillna(median_value)
-                            st.success(f"Missing values in column '{column_to_fill_numeric}' filled with the median ({median_value}).")
-
-                        elif fill_method_numeric == "Fill with Mode":
-                            mode_value = st.session_state.df[column_to_fill_numeric].mode()[0]
-                            st.session_state.df[column_to_fill_numeric] = st.session_state.df[column_to_fill_numeric].fillna(mode_value)
-                            st.success(f"Missing values in column '{column_to_fill_numeric}' filled with the mode ({mode_value}).")
 
                         elif fill_method_numeric == "Fill with Specific Value":
                             specific_value_numeric = st.sidebar.number_input("Enter the specific value:", value=0.0)
 
                             if specific_value_numeric == 0.0:
                               st.warning("Please enter a value greater than 0 to fill the missing data.")
-                            else:
-                                st.session_state.df[column_to_fill_numeric] = st.session_state.df[column_to_fill_numeric].fillna(specific_value_numeric)
-                                st.success(f"Missing values in column '{column_to_fill_numeric}' filled with '{specific_value_numeric}'.")
-
-
-
-
+                            elif st.sidebar.button("Fill Numeric Column"):
+                                apply_cleaning_step(
+                                    {"op": "fill_missing", "column": column_to_fill_numeric, "method": "value", "value": specific_value_numeric},
+                                    f"Missing values in column '{column_to_fill_numeric}' filled with '{specific_value_numeric}'."
+                                )
+
+                        elif st.sidebar.button("Fill Numeric Column"):
+                            method = {"Fill with Mean": "mean", "Fill with Median": "median", "Fill with Mode": "mode"}[fill_method_numeric]
+                            value = fill_value(st.session_state.df[column_to_fill_numeric], method)
+                            apply_cleaning_step(
+                                {"op": "fill_missing", "column": column_to_fill_numeric, "method": method},
+                                f"Missing values in column '{column_to_fill_numeric}' filled with the {method} ({value})."
+                            )
 
                 else:
                     st.warning("No numeric columns available to fill missing values.")
 
                 # Handle missing values for text columns
-                text_columns = st.session_state.df.select_dtypes(include=[object]).columns.tolist()
+                text_columns = st.session_state.df.select_dtypes(include=[object, "category", "string"]).columns.tolist()
                 if text_columns:
                     st.subheader("Missing Values in Text Columns:")
                     missing_values_text = st.session_state.df[text_columns].isnull().sum()
@@ -261,45 +622,165 @@ if uploaded_file is not None:
                             st.info(f"No missing value filling action selected for column '{column_to_fill_text}'.")
 
                         elif fill_method_text == "Fill with Most Frequent Value":
-                            most_frequent_value = st.session_state.df[column_to_fill_text].mode()[0]
-                            st.session_state.df[column_to_fill_text] = st.session_state.df[column_to_fill_text].fillna(most_frequent_value)
-                            st.success(f"Missing values in column '{column_to_fill_text}' filled with the most frequent value ({most_frequent_value}).")
+                            if st.sidebar.button("Fill Text Column"):
+                                most_frequent_value = fill_value(st.session_state.df[column_to_fill_text], "mode")
+                                apply_cleaning_step(
+                                    {"op": "fill_missing", "column": column_to_fill_text, "method": "mode"},
+                                    f"Missing values in column '{column_to_fill_text}' filled with the most frequent value ({most_frequent_value})."
+                                )
 
                         elif fill_method_text == "Fill with Specific Value":
                             specific_value_text = st.sidebar.text_input("Enter the specific value:", value="")
     
                             if specific_value_text.strip() != "":  # التحقق من أن القيمة المدخلة ليست فارغة
-                              st.session_state.df[column_to_fill_text] = st.session_state.df[column_to_fill_text].fillna(specific_value_text)
-                              st.success(f"Missing values in column '{column_to_fill_text}' filled with '{specific_value_text}'.")
+                                if st.sidebar.button("Fill Text Column"):
+                                    apply_cleaning_step(
+                                        {"op": "fill_missing", "column": column_to_fill_text, "method": "value", "value": specific_value_text},
+                                        f"Missing values in column '{column_to_fill_text}' filled with '{specific_value_text}'."
+                                    )
                             else:
                                 st.warning("Please enter a valid value to fill the missing data.")
 
-
-
-
                 else:
                     st.warning("No text columns available to fill missing values.")
 
-                # Mark as cleaned
-                st.session_state.cleaned = True
+            elif cleaning_option == "Bulk Imputation":
+                st.header("Bulk Imputation")
+                missing_counts = st.session_state.df.isna().sum()
+                missing_counts = missing_counts[missing_counts > 0]
+                if missing_counts.empty:
+                    st.info("The dataset has no missing values.")
+                else:
+                    columns_with_missing = missing_counts.index.tolist()
+                    is_numeric = [
+                        pd.api.types.is_numeric_dtype(st.session_state.df[column].dtype)
+                        and not pd.api.types.is_bool_dtype(st.session_state.df[column].dtype)
+                        for column in columns_with_missing
+                    ]
+                    with st.sidebar.expander("Default Strategies"):
+                        numeric_default = st.selectbox("Numeric columns:", list(IMPUTE_STRATEGIES))
+                        other_default = st.selectbox(
+                            "Other columns:", [name for name in IMPUTE_STRATEGIES if name not in ("mean", "median")]
+                        )
+
+                    # One row per column with missing values; every row can be edited before applying
+                    key_columns = {str(column): column for column in st.session_state.df.columns}
+                    plan = st.data_editor(
+                        pd.DataFrame({
+                            "Column": [str(column) for column in columns_with_missing],
+                            "Type": [str(st.session_state.df[column].dtype) for column in columns_with_missing],
+                            "Missing": missing_counts.to_numpy(),
+                            "Strategy": [numeric_default if numeric else other_default for numeric in is_numeric],
+                            "Value": "",
+                            "Group By": None,
+                        }),
+                        column_config={
+                            "Strategy": st.column_config.SelectboxColumn(options=list(IMPUTE_STRATEGIES), required=True),
+                            "Value": st.column_config.TextColumn(help="Fill value for the 'constant' strategy"),
+                            "Group By": st.column_config.SelectboxColumn(
+                                options=list(key_columns), help="Compute the fill within groups of this column"
+                            ),
+                        },
+                        disabled=["Column", "Type", "Missing"],
+                        hide_index=True,
+                        key="imputation_plan"
+                    )
+
+                    if st.button("Apply Imputation"):
+                        strategies = {}
+                        problems = []
+                        for column, numeric, row in zip(columns_with_missing, is_numeric, plan.to_dict("records")):
+                            method = IMPUTE_STRATEGIES[row["Strategy"]]
+                            if method is None:
+                                continue
+                            if method in ("mean", "median") and not numeric:
+                                problems.append(f"'{column}' is not numeric; choose mode, constant or a fill.")
+                                continue
+                            strategy = {"method": method}
+                            if method == "value":
+                                value = (row["Value"] or "").strip()
+                                if not value:
+                                    problems.append(f"Enter a constant for '{column}'.")
+                                    continue
+                                try:
+                                    strategy["value"] = float(value) if numeric else value
+                                except ValueError:
+                                    problems.append(f"'{value}' is not a number for numeric column '{column}'.")
+                                    continue
+                            elif row["Group By"]:
+                                strategy["by"] = key_columns[row["Group By"]]
+                            strategies[column] = strategy
+
+                        for problem in problems:
+                            st.warning(problem)
+                        if not strategies:
+                            st.info("No imputation strategy selected.")
+                        elif not problems:
+                            before = st.session_state.df
+                            apply_cleaning_step({"op": "impute_missing", "strategies": strategies}, rerun=False)
+                            filled = (before[list(strategies)].isna().sum()
+                                      - st.session_state.df[list(strategies)].isna().sum())
+                            st.session_state.cleaning_message = (
+                                f"Filled {filled.sum():,} missing values in {len(strategies)} columns.\n\n"
+                                + "\n".join(f"- **{column}**: {count:,} filled" for column, count in filled.items())
+                            )
+                            st.rerun()
 
             elif cleaning_option == "Remove Columns":
                 st.header("Remove Columns")
                 columns_to_remove = st.sidebar.multiselect(
                     "Select columns to remove:", st.session_state.df.columns.tolist()
                 )
-                if columns_to_remove:
-                    st.session_state.df = st.session_state.df.drop(columns=columns_to_remove)
-                    st.success(f"Columns removed: {', '.join(columns_to_remove)}")
-                st.session_state.cleaned = True  # Mark as cleaned
+                if columns_to_remove and st.sidebar.button("Remove Selected Columns"):
+                    apply_cleaning_step(
+                        {"op": "drop_columns", "columns": columns_to_remove},
+                        f"Columns removed: {', '.join(columns_to_remove)}"
+                    )
 
             elif cleaning_option == "Drop Rows with Missing Values":
                 st.header("Drop Rows with Missing Values")
-                initial_rows = len(st.session_state.df)
-                st.session_state.df = st.session_state.df.dropna()
-                final_rows = len(st.session_state.df)
-                st.success(f"Rows with missing values have been dropped. Rows reduced from {initial_rows} to {final_rows}.")
-                st.session_state.cleaned = True  # Mark as cleaned
+                if st.button("Drop Rows with Missing Values"):
+                    apply_cleaning_step(
+                        {"op": "drop_missing_rows"},
+                        "Rows with missing values have been dropped. Rows reduced from {initial_rows} to {final_rows}."
+                    )
+
+            elif cleaning_option == "Optimize Memory":
+                st.header("Optimize Memory")
+                report = cached_optimization_report(st.session_state.df, dataset_version())
+                before_mb = report["bytes_before"].sum() / 1024 ** 2
+                after_mb = report["bytes_after"].sum() / 1024 ** 2
+                st.markdown(
+                    f"**Total**: {before_mb:.1f} MB now, {after_mb:.1f} MB with every suggested type "
+                    f"({1 - after_mb / before_mb if before_mb else 0:.0%} less)"
+                )
+                st.dataframe(
+                    report.assign(
+                        **{"MB before": report["bytes_before"] / 1024 ** 2, "MB after": report["bytes_after"] / 1024 ** 2}
+                    ).drop(columns=["bytes_before", "bytes_after"]),
+                    hide_index=True
+                )
+
+                suggestions = report.dropna(subset=["suggested"])
+                if suggestions.empty:
+                    st.info("All columns already use compact data types.")
+                else:
+                    # Lossy suggestions (float32 rounds to about 7 significant digits) are not preselected
+                    lossless = suggestions[~suggestions["suggested"].isin(LOSSY_DTYPES)]
+                    columns_to_optimize = st.multiselect(
+                        "Columns to convert to their suggested type:",
+                        suggestions["column"].tolist(),
+                        default=lossless["column"].tolist(),
+                        help="float32 keeps about 7 significant digits, so float columns are only converted when chosen."
+                    )
+                    if columns_to_optimize and st.button("Apply Suggested Types"):
+                        chosen = suggestions[suggestions["column"].isin(columns_to_optimize)]
+                        apply_cleaning_step(
+                            {"op": "convert_dtypes", "dtypes": dict(zip(chosen["column"], chosen["suggested"]))},
+                            f"Converted {len(chosen)} columns: memory went from "
+                            f"{chosen['bytes_before'].sum() / 1024 ** 2:.1f} MB to "
+                            f"{chosen['bytes_after'].sum() / 1024 ** 2:.1f} MB."
+                        )
 
     # Section 3: Outliers Detection
         elif section == "Outliers Detection":
@@ -307,69 +788,56 @@ if uploaded_file is not None:
             with st.sidebar.expander("Choose Outlier Detection Method:"):
                 outlier_method = st.radio(
                     "Select Outlier Detection Method:",
-                    ["IQR"]
+                    list(OUTLIER_METHOD_LABELS)
+                )
+                detection = OUTLIER_METHOD_LABELS[outlier_method]
+                threshold = st.number_input(
+                    "Threshold (IQR multiplier or |z| limit):", min_value=0.1,
+                    value=OUTLIER_METHODS[detection], step=0.1
+                )
+                approximate = st.checkbox(
+                    "Approximate quantiles from a sample (large datasets)",
+                    value=len(st.session_state.df) > APPROX_SAMPLE_ROWS * 5
                 )
 
             # Define numeric_columns for outlier detection
             numeric_columns = st.session_state.df.select_dtypes(include=[np.number]).columns.tolist()
 
-            if outlier_method == "IQR":
-                st.header("Outlier Detection using IQR")
-                Q1 = st.session_state.df[numeric_columns].quantile(0.25)
-                Q3 = st.session_state.df[numeric_columns].quantile(0.75)
-                IQR = Q3 - Q1
+            st.header(f"Outlier Detection using {outlier_method}")
+            counts = cached_outlier_counts(
+                st.session_state.df, dataset_version(), numeric_columns, approximate, detection, threshold
+            )
 
-                # Detect outliers
-                outliers = ((st.session_state.df[numeric_columns] < (Q1 - 1.5 * IQR)) | 
-                             (st.session_state.df[numeric_columns] > (Q3 + 1.5 * IQR)))
-                
-                # Display the number of outliers for each column
-                st.write("Number of outliers detected using IQR method for each column:")
-                outlier_counts = outliers.sum()  # Count of True values (outliers)
-                st.write(outlier_counts)
-
-                # Add option to fill outliers with predefined methods or a custom value
-                fill_method = st.sidebar.radio("Select how to fill outliers:", 
-                                                ["Do Nothing","Replace with Mean", "Replace with Median", 
-                                                 "Replace with Mode", "Replace with Custom Value"])
-                custom_value = None
-                if fill_method == "Replace with Custom Value":
-                    custom_value = st.sidebar.number_input("Enter value to replace outliers:", value=0)
-
-                column_to_fill = st.sidebar.selectbox("Select a column to replace outliers:", numeric_columns)
-
-                # Replace outliers based on the selected method
-                if st.sidebar.button("Replace Outliers"):
-                    
-                    if fill_method == "Do Nothing":
-                            st.info(f"No OutLier Action '{column_to_fill}'.")
-
-                    elif fill_method == "Replace with Mean":
-                        mean_value = st.session_state.df[column_to_fill].mean()
-                        st.session_state.df[column_to_fill] = st.session_state.df[column_to_fill].where(
-                            ~outliers[column_to_fill], mean_value
-                        )
-                        st.success(f"Outliers in column '{column_to_fill}' replaced with the mean value ({mean_value}).")
+            # Display the number of outliers for each column, for every method
+            st.write("Number of outliers detected for each column (selected method first):")
+            st.write(counts.rename(columns={method: label for label, method in OUTLIER_METHOD_LABELS.items()}))
 
-                    elif fill_method == "Replace with Median":
-                        median_value = st.session_state.df[column_to_fill].median()
-                        st.session_state.df[column_to_fill] = st.session_state.df[column_to_fill].where(
-                            ~outliers[column_to_fill], median_value
-                        )
-                        st.success(f"Outliers in column '{column_to_fill}' replaced with the median value ({median_value}).")
+            # Add option to fill outliers with predefined methods or a custom value
+            fill_method = st.sidebar.radio("Select how to fill outliers:", 
+                                            ["Do Nothing","Replace with Mean", "Replace with Median", 
+                                             "Replace with Mode", "Replace with Custom Value"])
+            custom_value = None
+            if fill_method == "Replace with Custom Value":
+                custom_value = st.sidebar.number_input("Enter value to replace outliers:", value=0)
 
-                    elif fill_method == "Replace with Mode":
-                        mode_value = st.session_state.df[column_to_fill].mode()[0]
-                        st.session_state.df[column_to_fill] = st.session_state.df[column_to_fill].where(
-                            ~outliers[column_to_fill], mode_value
-                        )
-                        st.success(f"Outliers in column '{column_to_fill}' replaced with the mode value ({mode_value}).")
+            columns_to_fill = st.sidebar.multiselect("Select columns to replace outliers:", numeric_columns)
 
-                    elif fill_method == "Replace with Custom Value" and custom_value is not None:
-                        st.session_state.df[column_to_fill] = st.session_state.df[column_to_fill].where(
-                            ~outliers[column_to_fill], custom_value
-                        )
-                        st.success(f"Outliers in column '{column_to_fill}' replaced with the custom value ({custom_value}).")
+            # Replace outliers based on the selected method
+            if st.sidebar.button("Replace Outliers"):
+                
+                if fill_method == "Do Nothing" or not columns_to_fill:
+                        st.info("No outlier action selected.")
+
+                else:
+                    method = {"Replace with Mean": "mean", "Replace with Median": "median",
+                              "Replace with Mode": "mode", "Replace with Custom Value": "value"}[fill_method]
+                    label = "custom value" if method == "value" else method
+                    replaced = counts.loc[columns_to_fill, detection].sum()
+                    apply_cleaning_step(
+                        {"op": "replace_outliers", "columns": columns_to_fill, "method": method, "value": custom_value,
+                         "detection": detection, "threshold": threshold, "approximate": approximate},
+                        f"{replaced} outliers in {', '.join(columns_to_fill)} replaced with the {label}."
+                    )
 
             
 
@@ -383,58 +851,123 @@ if uploaded_file is not None:
 
             numeric_columns = st.session_state.df.select_dtypes(include=[np.number]).columns.tolist()
 
+            if vis_option in ["Scatter Plot", "Pair Plot"]:
+                with st.sidebar.expander("Rendering Options"):
+                    point_budget = st.number_input("Maximum points to draw:", min_value=1000, value=MAX_POINTS, step=10000)
+                    render_mode = st.radio("Above that, draw a:", ["Stratified Sample", "Density Grid"])
+                total_rows = len(st.session_state.df)
+
             if vis_option in ["Histogram", "Box Plot", "Violin Plot"]:
                 column_to_plot = st.sidebar.selectbox("Select a numeric column to plot:", numeric_columns)
                 st.header(f"{vis_option} of {column_to_plot}")
-                if vis_option == "Histogram":
-                    fig = plt.figure(figsize=(10, 6))
-                    sns.histplot(st.session_state.df[column_to_plot], kde=True, bins=30)
-                    st.pyplot(fig)
-
-                elif vis_option == "Box Plot":
-                    fig = plt.figure(figsize=(10, 6))
-                    sns.boxplot(x=st.session_state.df[column_to_plot])
-                    st.pyplot(fig)
-
-                elif vis_option == "Violin Plot":
-                    fig = plt.figure(figsize=(10, 6))
-                    sns.violinplot(x=st.session_state.df[column_to_plot])
-                    st.pyplot(fig)
+                chart = cached_chart(st.session_state.df, dataset_version(), column_to_plot, vis_option)
+                if chart is None:
+                    st.warning(f"Column '{column_to_plot}' has no values to plot.")
+                else:
+                    st.image(chart)
 
             elif vis_option == "Scatter Plot":
                 x_axis = st.sidebar.selectbox("Select the column for X-axis:", numeric_columns)
                 y_axis = st.sidebar.selectbox("Select the column for Y-axis:", numeric_columns)
                 st.header(f"Scatter Plot between {x_axis} and {y_axis}")
                 fig = plt.figure(figsize=(10, 6))
-                sns.scatterplot(x=st.session_state.df[x_axis], y=st.session_state.df[y_axis])
-                st.pyplot(fig)
+                if render_mode == "Density Grid" and total_rows > point_budget:
+                    counts, x_edges, y_edges, points = cached_density(st.session_state.df, dataset_version(), x_axis, y_axis)
+                    mesh = plt.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap="viridis")
+                    plt.colorbar(mesh, label="Points per cell")
+                    plt.xlabel(x_axis)
+                    plt.ylabel(y_axis)
+                    st.pyplot(fig)
+                    plt.close(fig)
+                    st.caption(f"All {points:,} points binned into a {counts.shape[0]}×{counts.shape[1]} density grid.")
+                else:
+                    sample = cached_sample(st.session_state.df, dataset_version(), list(dict.fromkeys([x_axis, y_axis])), point_budget)
+                    sns.scatterplot(x=sample[x_axis], y=sample[y_axis])
+                    st.pyplot(fig)
+                    plt.close(fig)
+                    st.caption(f"Showing {len(sample):,} of {total_rows:,} points.")
 
             elif vis_option == "Correlation Matrix":
                 st.header("Correlation Matrix")
-                corr = st.session_state.df[numeric_columns].corr()
-                fig = plt.figure(figsize=(10, 8))
-                sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5)
+                corr_method = st.sidebar.radio("Correlation method:", ["Pearson", "Spearman"])
+                top_k = st.sidebar.number_input("Number of strongest pairs to list:", min_value=1, value=20)
+                corr, counts = cached_correlation(
+                    st.session_state.df, dataset_version(), numeric_columns, corr_method.lower()
+                )
+                if len(numeric_columns) <= ANNOTATE_MAX_COLUMNS:
+                    fig = plt.figure(figsize=(10, 8))
+                    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", linewidths=0.5)
+                else:
+                    # Too many cells to label: cluster similar columns together instead
+                    order = cluster_order(corr)
+                    fig = plt.figure(figsize=(12, 10))
+                    sns.heatmap(corr.loc[order, order], cmap="coolwarm", vmin=-1, vmax=1,
+                                xticklabels=False, yticklabels=False)
+                    st.caption(f"{len(numeric_columns)} columns, ordered by hierarchical clustering.")
                 st.pyplot(fig)
+                plt.close(fig)
+
+                st.subheader(f"Top {top_k} Strongest Correlations")
+                st.dataframe(top_pairs(corr, counts, top_k), hide_index=True)
 
             elif vis_option == "Pair Plot":
                 st.header("Pair Plot")
-                fig = px.scatter_matrix(st.session_state.df[numeric_columns])
-                st.plotly_chart(fig)
+                pair_columns = st.sidebar.multiselect(
+                    f"Select up to {MAX_PAIR_COLUMNS} columns for the pair plot:",
+                    numeric_columns,
+                    default=numeric_columns[:MAX_PAIR_COLUMNS],
+                    max_selections=MAX_PAIR_COLUMNS
+                )
+                if pair_columns:
+                    # A scatter matrix has no density form, so it is always sampled
+                    sample = cached_sample(st.session_state.df, dataset_version(), pair_columns, point_budget)
+                    fig = px.scatter_matrix(sample)
+                    st.plotly_chart(fig)
+                    st.caption(f"Showing {len(sample):,} of {total_rows:,} rows across {len(pair_columns)} columns.")
+                else:
+                    st.warning("Please select at least one numeric column.")
+        timer.lap(f"Section: {section}")
+
+        # What this session shares with others and what it holds on its own
+        with st.sidebar.expander("Memory Report"):
+            report = session_memory_report()
+            totals = report.groupby("status")["bytes"].sum() / 1024 ** 2
+            st.markdown(f"- **Shared**: {totals.get('Shared', 0):.1f} MB")
+            st.markdown(f"- **Private to this session**: {totals.get('Private', 0):.1f} MB")
+            store = shared_store()
+            st.caption(f"{len(store)} shared datasets, {store.total_bytes() / 1024 ** 2:.1f} MB "
+                       f"of {store.memory_budget / 1024 ** 2:.0f} MB")
+            st.dataframe(report.assign(MB=report["bytes"] / 1024 ** 2).drop(columns="bytes"), hide_index=True)
+        timer.lap("Memory report")
 
         # Download button for cleaned dataset (only after cleaning)
         if st.session_state.cleaned:
             st.sidebar.subheader("Download Cleaned Dataset")
-            cleaned_file = st.session_state.df.to_csv(index=False)
-            st.download_button(
-                label="Download Cleaned Dataset",
-                data=cleaned_file,
-                file_name='cleaned_dataset.csv',
-                mime='text/csv',
-                key='download-csv'
-            )
+            export_format = st.sidebar.selectbox("Select a file format:", list(EXPORT_FORMATS))
+            extension, mime = EXPORT_FORMATS[export_format]
+
+            # Serialize only on request, once per dataset version and format. The
+            # download button reads the whole file into memory, so it is only
+            # rendered on the run right after "Prepare Download"; preparing the
+            # same version again reuses the file written the first time.
+            if st.sidebar.button("Prepare Download"):
+                with st.spinner(f"Writing {export_format} file..."):
+                    export_file_path = export_path(st.session_state.df, export_format, dataset_version())
+                with open(export_file_path, "rb") as export_file:
+                    st.download_button(
+                        label="Download Cleaned Dataset",
+                        data=export_file,
+                        file_name=f'cleaned_dataset{extension}',
+                        mime=mime,
+                        key='download-csv'
+                    )
+        timer.lap("Download")
 
     except Exception as e:
         st.error(f"An error occurred: {e}")
 
 else:
-    st.info("Please upload a CSV or Excel file to start analyzing your data.")
\ No newline at end of file
+    st.info("Please upload a CSV or Excel file to start analyzing your data.")
+
+finish_rerun()
+show_diagnostics()
\ No newline at end of file
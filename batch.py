@@ -0,0 +1,163 @@
+"""Apply a saved cleaning recipe to every CSV/Excel file in a directory.
+
+    python batch.py cleaning_recipe.json nightly/ cleaned/ --workers 8
+
+Runs the same cleaning operations as the app, without Streamlit, one file
+per worker process, and writes each cleaned file as Parquet.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are skipped there
+    resource = None
+
+from cleaning import apply_step
+from export import write_atomically, write_export
+from ingestion import read_csv_chunked
+from pipeline import load_recipe, schema_mismatches
+
+INPUT_EXTENSIONS = (".csv", ".xlsx", ".xls")
+PARQUET_FORMATS = {"snappy": "Parquet (snappy)", "zstd": "Parquet (zstd)"}
+
+
+def read_dataset(path, large_file_mode=False):
+    if path.suffix.lower() == ".csv":
+        if large_file_mode:
+            with open(path, "rb") as file:
+                return read_csv_chunked(file)
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def clean_frame(df, recipe):
+    # Apply the recipe's steps in order; unlike replay() this keeps no undo
+    # snapshots, so a worker only ever holds the current frame
+    for step in recipe["steps"]:
+        df, _ = apply_step(df, step)
+    return df
+
+
+def clean_file(path, recipe, output_dir, compression="zstd", large_file_mode=False):
+    """Read, clean and write one file; returns its row counts and timings."""
+    pd.set_option("mode.copy_on_write", True)
+    path = Path(path)
+    result = {"file": path.name, "status": "ok", "rows_in": None, "rows_out": None,
+              "read_s": None, "clean_s": None, "write_s": None, "message": ""}
+    started = time.perf_counter()
+    try:
+        df = read_dataset(path, large_file_mode)
+        result["rows_in"] = len(df)
+        result["read_s"] = time.perf_counter() - started
+        problems = schema_mismatches(df, recipe)
+        if problems:
+            result["message"] = "; ".join(problems)
+
+        started = time.perf_counter()
+        df = clean_frame(df, recipe)
+        result["rows_out"] = len(df)
+        result["clean_s"] = time.perf_counter() - started
+
+        # Written under a temporary name so a failed run never leaves a partial output
+        started = time.perf_counter()
+        target = Path(output_dir) / f"{path.stem}.parquet"
+        write_atomically(target, lambda partial: write_export(df, PARQUET_FORMATS[compression], partial))
+        result["write_s"] = time.perf_counter() - started
+    except Exception as e:  # Including MemoryError under --max-memory-mb
+        result["status"] = "failed"
+        result["message"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _limit_memory(max_memory_mb):
+    # Runs in every worker: allocations beyond the limit raise MemoryError in
+    # that worker (failing its current file) instead of exhausting the machine
+    if max_memory_mb and resource is not None:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def input_files(input_dir):
+    return sorted(path for path in Path(input_dir).iterdir()
+                  if path.is_file() and path.suffix.lower() in INPUT_EXTENSIONS)
+
+
+def run_batch(recipe, input_dir, output_dir, workers=None, max_memory_mb=None,
+              compression="zstd", large_file_mode=False, progress=None):
+    """Clean every input file in parallel; returns one summary row per file.
+
+    Each worker process handles one file at a time. On Python 3.11+ it is
+    replaced after every file, so memory a large file left behind is returned
+    to the system; older versions reuse workers, which keep their peak memory.
+    """
+    files = input_files(input_dir)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    results = []
+    # max_tasks_per_child was added to ProcessPoolExecutor in Python 3.11
+    recycle = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_limit_memory, initargs=(max_memory_mb,),
+                             **recycle) as executor:
+        futures = {
+            executor.submit(clean_file, path, recipe, output_dir, compression, large_file_mode): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # The worker itself died, e.g. killed by the OS
+                result = {"file": futures[future].name, "status": "failed", "message": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if progress:
+                progress(len(results), len(files), result)
+
+    summary = pd.DataFrame(results, columns=["file", "status", "rows_in", "rows_out",
+                                             "read_s", "clean_s", "write_s", "message"])
+    summary[["rows_in", "rows_out"]] = summary[["rows_in", "rows_out"]].astype("Int64")
+    summary[["read_s", "clean_s", "write_s"]] = summary[["read_s", "clean_s", "write_s"]].astype("float64")
+    summary["total_s"] = summary[["read_s", "clean_s", "write_s"]].sum(axis=1, min_count=1)
+    return summary.sort_values("file", ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a cleaning recipe to a directory of CSV/Excel files.")
+    parser.add_argument("recipe", help="recipe JSON exported from the app's Cleaning History")
+    parser.add_argument("input_dir", help="directory with the .csv/.xlsx/.xls files to clean")
+    parser.add_argument("output_dir", help="directory for the cleaned .parquet files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--max-memory-mb", type=int, default=None,
+                        help="address-space limit per worker; a file that needs more fails on its own")
+    parser.add_argument("--compression", choices=sorted(PARQUET_FORMATS), default="zstd")
+    parser.add_argument("--large-file-mode", action="store_true",
+                        help="read CSV files in chunks with compact data types, as the app's Large File Mode")
+    parser.add_argument("--summary", help="also write the per-file summary to this CSV file")
+    args = parser.parse_args(argv)
+
+    with open(args.recipe, encoding="utf-8") as recipe_file:
+        recipe = load_recipe(recipe_file.read())
+
+    def report(done, total, result):
+        print(f"[{done}/{total}] {result['file']}: {result['status']}", file=sys.stderr)
+
+    started = time.perf_counter()
+    summary = run_batch(recipe, args.input_dir, args.output_dir, workers=args.workers,
+                        max_memory_mb=args.max_memory_mb, compression=args.compression,
+                        large_file_mode=args.large_file_mode, progress=report)
+    elapsed = time.perf_counter() - started
+
+    print(summary.to_string(index=False, float_format=lambda seconds: f"{seconds:.2f}"))
+    failed = int((summary["status"] != "ok").sum())
+    print(f"\n{len(summary)} files, {failed} failed, "
+          f"{summary['rows_in'].sum():,} rows in, {summary['rows_out'].sum():,} rows out, {elapsed:.1f}s")
+    if args.summary:
+        summary.to_csv(args.summary, index=False)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Compare benchmark results against a stored baseline.
+
+    python -m benchmarks.compare benchmark_results.json benchmarks/baseline.json
+
+Exits with status 1 when any benchmark got slower, or used more peak
+memory, than the baseline by more than the allowed thresholds.
+"""
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+# Relative increases tolerated before a result counts as a regression
+TIME_THRESHOLD = 0.25
+MEMORY_THRESHOLD = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.01
+MIN_MEMORY_MB = 1.0
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    return pd.DataFrame(report["results"]).set_index(["rows", "benchmark"])
+
+
+def compare(results, baseline, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """One row per benchmark present in both runs, with ratios and a regression flag."""
+    both = results.join(baseline, how="inner", lsuffix="", rsuffix="_baseline")
+    table = pd.DataFrame({
+        "seconds": both["seconds"],
+        "baseline_seconds": both["seconds_baseline"],
+        "time_ratio": both["seconds"] / both["seconds_baseline"],
+        "peak_mb": both["peak_mb"],
+        "baseline_peak_mb": both["peak_mb_baseline"],
+        "memory_ratio": both["peak_mb"] / both["peak_mb_baseline"],
+    }, index=both.index)
+    slower = ((table["time_ratio"] > 1 + time_threshold)
+              & (table["seconds"] - table["baseline_seconds"] > MIN_SECONDS))
+    larger = ((table["memory_ratio"] > 1 + memory_threshold)
+              & (table["peak_mb"] - table["baseline_peak_mb"] > MIN_MEMORY_MB))
+    table["regression"] = slower | larger.fillna(False)
+    return table.sort_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    parser.add_argument("results", help="JSON written by benchmarks.suite")
+    parser.add_argument("baseline", help="stored baseline JSON from an earlier run")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD,
+                        help=f"allowed relative slowdown (default {TIME_THRESHOLD})")
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD,
+                        help=f"allowed relative growth of peak memory (default {MEMORY_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    results, baseline = load_results(args.results), load_results(args.baseline)
+    table = compare(results, baseline, args.time_threshold, args.memory_threshold)
+    print(table.to_string(float_format=lambda value: f"{value:.3f}"))
+
+    missing = baseline.index.difference(results.index)
+    if len(missing):
+        print(f"\n{len(missing)} baseline benchmarks were not run.")
+    regressions = table[table["regression"]]
+    if len(regressions):
+        print(f"\n{len(regressions)} regressions:")
+        for (rows, name), row in regressions.iterrows():
+            print(f"  {name} at {rows:,} rows: {row['time_ratio']:.2f}x time, {row['memory_ratio']:.2f}x memory")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# Share of columns of every kind when no mix is given
+DEFAULT_MIX = {"float": 0.4, "int": 0.2, "category": 0.2, "text": 0.1, "datetime": 0.1}
+
+
+def _column_kinds(columns, mix):
+    # Spread `columns` over the kinds in proportion to mix, at least one per kind
+    kinds = [kind for kind, share in mix.items() if share > 0]
+    total = sum(mix[kind] for kind in kinds)
+    counts = {kind: max(1, int(round(columns * mix[kind] / total))) for kind in kinds}
+    while sum(counts.values()) > max(columns, len(kinds)):
+        counts[max(counts, key=counts.get)] -= 1
+    while sum(counts.values()) < columns:
+        counts[max(kinds, key=lambda kind: mix[kind])] += 1
+    return [kind for kind in kinds for _ in range(counts[kind])]
+
+
+def _column(kind, rows, cardinality, outlier_rate, rng):
+    if kind == "float":
+        values = rng.normal(100, 15, rows)
+        outliers = rng.random(rows) < outlier_rate
+        values[outliers] += rng.choice([-1, 1], outliers.sum()) * rng.uniform(10, 50, outliers.sum()) * 15
+        return pd.Series(values)
+    if kind == "int":
+        values = rng.integers(0, 1_000, rows)
+        outliers = rng.random(rows) < outlier_rate
+        values[outliers] = rng.integers(10_000, 100_000, outliers.sum())
+        return pd.Series(values)
+    if kind == "category":
+        vocabulary = np.array([f"level {i}" for i in range(cardinality)], dtype=object)
+        return pd.Series(vocabulary[rng.zipf(1.5, rows) % cardinality])
+    if kind == "text":
+        # Mostly unique free text
+        ids = rng.integers(0, rows * 10, rows)
+        return pd.Series(ids.astype(str), dtype=object).radd("note #")
+    if kind == "datetime":
+        start = np.datetime64("2015-01-01T00:00:00")
+        return pd.Series(start + rng.integers(0, 10 * 365 * 24 * 3600, rows).astype("timedelta64[s]"))
+    raise ValueError(f"Unknown column kind: {kind!r}")
+
+
+def make_dataset(rows, columns=12, mix=None, null_rate=0.05, cardinality=50,
+                 duplicate_rate=0.01, outlier_rate=0.005, seed=0):
+    """Synthetic frame shaped like the uploads the app sees.
+
+    columns are split between float, int, low-cardinality category (Zipf
+    distributed over `cardinality` levels), free text and datetime columns
+    according to mix. null_rate of the cells in every column are missing
+    (int columns then become float, as pd.read_csv would make them),
+    duplicate_rate of the rows repeat an earlier row and outlier_rate of the
+    numeric values lie far outside the bulk. Column names contain spaces and
+    capitals so that "Clean Column Names" has work to do. The same arguments
+    always give the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for number, kind in enumerate(_column_kinds(columns, mix or DEFAULT_MIX), start=1):
+        series = _column(kind, rows, cardinality, outlier_rate, rng)
+        if null_rate:
+            series = series.mask(rng.random(rows) < null_rate)
+        data[f"{kind.title()} Column {number}"] = series
+    df = pd.DataFrame(data)
+
+    duplicates = int(rows * duplicate_rate)
+    if duplicates and rows > 1:
+        targets = rng.choice(np.arange(1, rows), duplicates, replace=False)
+        sources = (targets * rng.random(duplicates)).astype(np.int64)
+        df.iloc[targets] = df.iloc[sources].to_numpy()
+        df = df.astype(dict(df.dtypes))
+    return df
@@ -0,0 +1,255 @@
+"""Time and measure the peak memory of every major path of the app.
+
+    python -m benchmarks.suite --sizes 10k,100k,1m --output results.json
+    python -m benchmarks.compare results.json benchmarks/baseline.json
+
+Runs from the repository root. Every benchmark calls the same functions the
+app calls for that section, on a synthetic dataset from benchmarks.datagen,
+without Streamlit in between.
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import seaborn as sns
+from matplotlib.figure import Figure
+
+from benchmarks.datagen import make_dataset
+from charts import (MAX_POINTS, MAX_PAIR_COLUMNS, category_counts, density_grid, numeric_column_stats,
+                    render_box, render_category_counts, render_histogram, render_violin, stratified_sample)
+from cleaning import clean_column_names, clean_values, drop_duplicates, fill_missing, replace_outliers
+from correlation import correlation_matrix
+from export import write_export
+from ingestion import read_csv_chunked
+from outliers import outlier_counts, outlier_statistics
+from profiling import frame_fingerprint, missing_values, profile_frame, summary_statistics, unique_values
+
+# Same pandas mode as the app, so cleaning steps copy what they do in the app
+pd.set_option("mode.copy_on_write", True)
+
+DEFAULT_SIZES = "10k,100k,1m,10m"
+# Generated CSV files are kept here and reused across runs
+DATA_DIR = Path(tempfile.gettempdir()) / "streamlit_app_benchmarks"
+
+
+def parse_size(text):
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    text = text.strip().lower()
+    if text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def _figure_bytes(figure):
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _scatter(df, x, y):
+    sample = stratified_sample(df, [x, y], MAX_POINTS)
+    figure = Figure(figsize=(10, 6))
+    sns.scatterplot(x=sample[x], y=sample[y], ax=figure.subplots())
+    return _figure_bytes(figure)
+
+
+def _scatter_density(df, x, y):
+    counts, x_edges, y_edges, _ = density_grid(df[x], df[y])
+    figure = Figure(figsize=(10, 6))
+    figure.subplots().pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0))
+    return _figure_bytes(figure)
+
+
+def _correlation_heatmap(df, columns):
+    corr, _ = correlation_matrix(df, columns)
+    figure = Figure(figsize=(10, 8))
+    sns.heatmap(corr, annot=True, fmt=".2f", ax=figure.subplots())
+    return _figure_bytes(figure)
+
+
+def _pair_plot(df, columns):
+    # Streamlit ships the figure as JSON, so serializing it is part of the cost
+    return px.scatter_matrix(stratified_sample(df, columns, MAX_POINTS)).to_json()
+
+
+def _dataset_info(df):
+    buffer = StringIO()
+    df.info(buf=buffer)
+    return buffer.getvalue()
+
+
+def _read_large_file_mode(csv_path):
+    with open(csv_path, "rb") as file:
+        return read_csv_chunked(file)
+
+
+def _export_csv(df):
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(df, "CSV", Path(directory) / "export.csv")
+
+
+def benchmarks(df, csv_path):
+    """name -> (section, zero-argument callable) for one dataset."""
+    numeric = df.select_dtypes(include=np.number).columns.tolist()
+    text = df.select_dtypes(include="object").columns.tolist()
+    first, second = numeric[0], numeric[1 % len(numeric)]
+    profile = profile_frame(df)
+    return {
+        "parse_csv": ("Upload", lambda: pd.read_csv(csv_path)),
+        "parse_csv_large_file_mode": ("Upload", lambda: _read_large_file_mode(csv_path)),
+        "fingerprint": ("Data Show", lambda: frame_fingerprint(df)),
+        "preview": ("Data Show", lambda: df.head(5)),
+        "columns_info": ("Data Show", lambda: [pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes]),
+        "dataset_info": ("Data Show", lambda: _dataset_info(df)),
+        "profile": ("Data Show", lambda: profile_frame(df)),
+        "summary_statistics": ("Data Show", lambda: summary_statistics(profile)),
+        "missing_values": ("Data Show", lambda: missing_values(profile)),
+        "unique_values": ("Data Show", lambda: unique_values(profile)),
+        "value_distribution": ("Data Show", lambda: render_category_counts(category_counts(df[text[0]]), text[0])),
+        "clean_column_names": ("Cleaning", lambda: clean_column_names(df)),
+        "clean_values": ("Cleaning", lambda: clean_values(df)),
+        "fill_missing_mean": ("Cleaning", lambda: fill_missing(df, first, "mean")),
+        "fill_missing_median": ("Cleaning", lambda: fill_missing(df, first, "median")),
+        "fill_missing_mode": ("Cleaning", lambda: fill_missing(df, text[0], "mode")),
+        "drop_duplicates": ("Cleaning", lambda: drop_duplicates(df)),
+        "iqr_detection": ("Outliers", lambda: outlier_counts(df, outlier_statistics(df, numeric))),
+        "iqr_replacement": ("Outliers", lambda: replace_outliers(df, numeric, "median")),
+        "correlation_pearson": ("Visualization", lambda: correlation_matrix(df, numeric, "pearson")),
+        "correlation_spearman": ("Visualization", lambda: correlation_matrix(df, numeric, "spearman")),
+        "correlation_heatmap": ("Visualization", lambda: _correlation_heatmap(df, numeric)),
+        "histogram": ("Visualization", lambda: render_histogram(numeric_column_stats(df[first]), first)),
+        "box_plot": ("Visualization", lambda: render_box(numeric_column_stats(df[first]), first)),
+        "violin_plot": ("Visualization", lambda: render_violin(numeric_column_stats(df[first]), first)),
+        "scatter_plot": ("Visualization", lambda: _scatter(df, first, second)),
+        "scatter_density": ("Visualization", lambda: _scatter_density(df, first, second)),
+        "pair_plot": ("Visualization", lambda: _pair_plot(df, numeric[:MAX_PAIR_COLUMNS])),
+        "export_csv": ("Download", lambda: _export_csv(df)),
+    }
+
+
+def measure(function, repeat=3, memory=True):
+    """Best wall time over `repeat` runs, and the peak traced memory of one more run.
+
+    Peak memory is what tracemalloc sees above the starting point: Python
+    objects plus NumPy/pandas buffers, but not Arrow's own memory pool.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = peak / 1024 ** 2
+    return {"seconds": min(times), "runs": times, "peak_mb": peak_mb}
+
+
+def dataset_csv(rows, options):
+    # Generate the dataset once per size and options, then reuse its CSV file
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.blake2b(json.dumps(options, sort_keys=True).encode(), digest_size=8).hexdigest()
+    path = DATA_DIR / f"{rows}-rows-{digest}.csv"
+    if not path.exists():
+        partial = path.with_suffix(".partial")
+        make_dataset(rows, **options).to_csv(partial, index=False)
+        os.replace(partial, path)
+    return path
+
+
+def environment():
+    versions = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__}
+    try:
+        import pyarrow
+        versions["pyarrow"] = pyarrow.__version__
+    except ImportError:
+        pass
+    return {"platform": platform.platform(), "processor": platform.processor(),
+            "cpu_count": os.cpu_count(), "versions": versions}
+
+
+def run_suite(sizes, options, repeat=3, memory=True, only=None, log=print):
+    results = []
+    for rows in sizes:
+        log(f"Preparing {rows:,} rows...")
+        csv_path = dataset_csv(rows, options)
+        # The frame as the app holds it after a default upload
+        df = pd.read_csv(csv_path)
+        for name, (section, function) in benchmarks(df, csv_path).items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            result = measure(function, repeat, memory)
+            results.append({"rows": rows, "benchmark": name, "section": section, **result})
+            peak = f", peak {result['peak_mb']:.1f} MB" if memory else ""
+            log(f"  {name:<28} {result['seconds']:9.4f} s{peak}")
+        del df
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's data paths on synthetic datasets.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"row counts, e.g. 10k,1m (default {DEFAULT_SIZES})")
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--mix", help="column kind shares, e.g. float=0.5,int=0.2,category=0.2,text=0.1")
+    parser.add_argument("--null-rate", type=float, default=0.05)
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--outlier-rate", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark; the fastest is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the extra run that traces peak memory")
+    parser.add_argument("--only", help="comma-separated substrings of the benchmark names to run")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    options = {
+        "columns": args.columns,
+        "null_rate": args.null_rate,
+        "cardinality": args.cardinality,
+        "duplicate_rate": args.duplicate_rate,
+        "outlier_rate": args.outlier_rate,
+        "seed": args.seed,
+    }
+    if args.mix:
+        options["mix"] = {kind: float(share) for kind, share in
+                          (item.split("=") for item in args.mix.split(","))}
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+
+    results = run_suite(sizes, options, args.repeat, not args.no_memory,
+                        args.only.split(",") if args.only else None)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "dataset": options,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
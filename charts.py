@@ -0,0 +1,209 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+import seaborn as sns
+
+# Charts above this many points are sampled or binned before plotting
+MAX_POINTS = 50_000
+# Pair plots consider at most this many numeric columns
+MAX_PAIR_COLUMNS = 6
+# Grid used for stratification and density binning
+GRID_SIZE = 100
+STRATA_PER_AXIS = 20
+# Histogram bins, KDE evaluation points and drawn outliers per column
+HISTOGRAM_BINS = 30
+KDE_POINTS = 512
+MAX_FLIERS = 2_000
+# Categories shown by "Value Distribution per Column" before the rest become "Other"
+TOP_CATEGORIES = 20
+FIGURE_SIZE = (10, 6)
+
+
+def _cell_ids(values, bins):
+    # Equal-width bin number of every value, per column, combined into one id
+    ids = np.zeros(len(values), dtype=np.int64)
+    for column in values.T:
+        low, high = column.min(), column.max()
+        scale = bins / (high - low) if high > low else 0.0
+        ids = ids * bins + np.minimum(((column - low) * scale).astype(np.int64), bins - 1)
+    return ids
+
+
+def stratified_sample(df, columns, max_points=MAX_POINTS, seed=0):
+    """Rows of df[columns] thinned to about max_points.
+
+    Rows are grouped into a grid over the first two columns and each cell
+    keeps its proportional share, but at least one row, so sparse regions
+    and extreme values stay visible. Rows with missing values are dropped,
+    as the plotting functions would do anyway.
+    """
+    data = df[columns].dropna()
+    if len(data) <= max_points:
+        return data
+
+    rng = np.random.default_rng(seed)
+    values = data[columns[:2]].to_numpy(dtype="float64")
+    cells = _cell_ids(values, STRATA_PER_AXIS)
+    counts = np.bincount(cells)
+    fraction = max_points / len(data)
+    quota = np.maximum(np.floor(counts * fraction), np.minimum(counts, 1)).astype(np.int64)
+
+    # Random order within each cell, then keep the first quota rows of it
+    order = np.lexsort((rng.random(len(cells)), cells))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(len(cells)) - starts[cells[order]]
+    keep = np.sort(order[rank < quota[cells[order]]])
+    return data.iloc[keep]
+
+
+def density_grid(x, y, grid_size=GRID_SIZE):
+    # 2D histogram of every (x, y) pair with both values present
+    x = pd.Series(x).to_numpy(dtype="float64", na_value=np.nan)
+    y = pd.Series(y).to_numpy(dtype="float64", na_value=np.nan)
+    present = ~(np.isnan(x) | np.isnan(y))
+    counts, x_edges, y_edges = np.histogram2d(x[present], y[present], bins=grid_size)
+    return counts, x_edges, y_edges, int(present.sum())
+
+
+def _binned_kde(values, bins=KDE_POINTS):
+    # Gaussian KDE on a fixed grid: bin the data finely, then convolve the
+    # counts with the kernel, which is O(n + bins) instead of O(n * bins)
+    std = values.std()
+    if len(values) < 2 or std == 0:
+        return None, None
+    bandwidth = std * len(values) ** (-1 / 5)  # Scott's rule
+    low, high = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=bins, range=(low, high))
+    step = edges[1] - edges[0]
+    half_width = int(np.ceil(4 * bandwidth / step))
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    kernel /= kernel.sum()
+    density = np.convolve(counts, kernel, mode="same") / (len(values) * step)
+    return (edges[:-1] + edges[1:]) / 2, density
+
+
+def numeric_column_stats(series, bins=HISTOGRAM_BINS, seed=0):
+    """Everything the histogram, box and violin plots draw for one column.
+
+    Computed once from the non-missing values: bin counts, quartiles and
+    whiskers, a KDE on a fixed grid and a bounded sample of the outliers.
+    """
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    fliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(fliers) > MAX_FLIERS:
+        # Keep the extremes, sample the rest
+        sampled = np.random.default_rng(seed).choice(fliers, MAX_FLIERS - 2, replace=False)
+        fliers = np.concatenate(([fliers.min(), fliers.max()], sampled))
+
+    counts, edges = np.histogram(values, bins=bins)
+    kde_x, kde_density = _binned_kde(values)
+    return {
+        "count": len(values),
+        "mean": values.mean(),
+        "min": values.min(),
+        "max": values.max(),
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "whisker_low": inside.min(),
+        "whisker_high": inside.max(),
+        "fliers": fliers,
+        "histogram": (counts, edges),
+        "kde": (kde_x, kde_density),
+    }
+
+
+def category_counts(series, top_n=TOP_CATEGORIES):
+    # Most frequent values, with everything else summed into "Other"
+    counts = series.value_counts(dropna=True)
+    # Categories no row uses any more are listed with a count of 0
+    counts = counts[counts > 0]
+    if len(counts) > top_n:
+        other = pd.Series({f"Other ({len(counts) - top_n} values)": counts.iloc[top_n:].sum()})
+        counts = counts.iloc[:top_n]
+        counts.index = counts.index.astype(str)
+        counts = pd.concat([counts, other])
+    return counts
+
+
+def _figure_png(figure):
+    # Render without going through pyplot, so no figure is left registered
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png", bbox_inches="tight")
+    figure.clear()
+    return buffer.getvalue()
+
+
+def render_histogram(stats, column):
+    figure = Figure(figsize=FIGURE_SIZE)
+    ax = figure.subplots()
+    counts, edges = stats["histogram"]
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", alpha=0.6, edgecolor="white")
+    kde_x, kde_density = stats["kde"]
+    if kde_x is not None:
+        # Scale the density to bin counts, as seaborn's histplot(kde=True) does
+        ax.plot(kde_x, kde_density * stats["count"] * np.diff(edges).mean())
+        ax.set_xlim(edges[0], edges[-1])
+    ax.set_xlabel(column)
+    ax.set_ylabel("Count")
+    return _figure_png(figure)
+
+
+def _draw_box(ax, stats, height=0.4):
+    ax.add_patch(Rectangle((stats["q1"], -height / 2), stats["q3"] - stats["q1"], height,
+                           facecolor=sns.color_palette()[0], edgecolor="black"))
+    ax.plot([stats["median"]] * 2, [-height / 2, height / 2], color="black")
+    for start, end in [(stats["whisker_low"], stats["q1"]), (stats["q3"], stats["whisker_high"])]:
+        ax.plot([start, end], [0, 0], color="black")
+    for end in (stats["whisker_low"], stats["whisker_high"]):
+        ax.plot([end, end], [-height / 4, height / 4], color="black")
+    ax.plot(stats["fliers"], np.zeros(len(stats["fliers"])), "d", color="grey", markersize=4)
+
+
+def render_box(stats, column):
+    figure = Figure(figsize=FIGURE_SIZE)
+    ax = figure.subplots()
+    _draw_box(ax, stats)
+    ax.set_ylim(-1, 1)
+    ax.set_yticks([])
+    ax.set_xlabel(column)
+    return _figure_png(figure)
+
+
+def render_violin(stats, column):
+    figure = Figure(figsize=FIGURE_SIZE)
+    ax = figure.subplots()
+    kde_x, kde_density = stats["kde"]
+    if kde_x is not None:
+        # Clip the KDE to the data range, mirror it around zero
+        inside = (kde_x >= stats["min"]) & (kde_x <= stats["max"])
+        width = kde_density[inside] / kde_density.max() * 0.4
+        ax.fill_between(kde_x[inside], -width, width, color=sns.color_palette()[0], alpha=0.7)
+    ax.plot([stats["whisker_low"], stats["whisker_high"]], [0, 0], color="black", linewidth=1)
+    ax.plot([stats["q1"], stats["q3"]], [0, 0], color="black", linewidth=5)
+    ax.plot(stats["median"], 0, "o", color="white", markersize=5)
+    ax.set_ylim(-0.5, 0.5)
+    ax.set_yticks([])
+    ax.set_xlabel(column)
+    return _figure_png(figure)
+
+
+def render_category_counts(counts, column):
+    figure = Figure(figsize=FIGURE_SIZE)
+    ax = figure.subplots()
+    ax.barh(counts.index.astype(str), counts.to_numpy(), color=sns.color_palette("Set2", len(counts)))
+    ax.invert_yaxis()
+    ax.set_xlabel("count")
+    ax.set_ylabel(column)
+    return _figure_png(figure)
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+
+from type_inference import clean_values as infer_values, SAMPLE_SIZE, NUMERIC_THRESHOLD
+from outliers import outlier_statistics, outlier_mask
+
+# Every operation takes the current frame plus its parameters and returns
+# (new_frame, changed_columns). Operations never modify their input, so the
+# previous frame stays valid for undo snapshots.
+
+
+def clean_column_names(df):
+    cleaned = (
+        df.columns
+        .str.strip()
+        .str.replace(r"\s+", "_", regex=True)
+        .str.replace(r"[^a-zA-Z0-9_]", "")
+        .str.lower()
+        .str.replace(r"^(?=\d)", "_", regex=True)
+    )
+    return df.set_axis(cleaned, axis=1), []
+
+
+def clean_values(df, numeric_threshold=NUMERIC_THRESHOLD, sample_size=SAMPLE_SIZE):
+    result, conversions = infer_values(df, sample_size=sample_size, numeric_threshold=numeric_threshold)
+    return result, list(conversions)
+
+
+def rename_column(df, column, new_name):
+    return df.rename(columns={column: new_name}), []
+
+
+def convert_dtype(df, column, dtype):
+    result = df.copy(deep=False)
+    result[column] = df[column].astype(dtype)
+    return result, [column]
+
+
+def convert_dtypes(df, dtypes):
+    # Several conversions as one step, e.g. the suggestions of the memory report
+    result = df.copy(deep=False)
+    for column, dtype in dtypes.items():
+        result[column] = df[column].astype(dtype)
+    return result, list(dtypes)
+
+
+def drop_duplicates(df):
+    return df.drop_duplicates(), []
+
+
+def drop_missing_rows(df):
+    return df.dropna(), []
+
+
+def drop_columns(df, columns):
+    return df.drop(columns=columns), []
+
+
+def fill_value(series, method, value=None):
+    # The value a fill/replace method stands for, computed on the whole column
+    if method == "mean":
+        return series.mean()
+    if method == "median":
+        return series.median()
+    if method == "mode":
+        return series.mode()[0]
+    return value
+
+
+def _able_to_hold(series, value):
+    # Categorical columns only accept values that are already categories, and
+    # nullable integer columns only whole numbers within their range
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        return series.cat.add_categories([value])
+    if pd.api.types.is_integer_dtype(series.dtype) and pd.api.types.is_extension_array_dtype(series.dtype):
+        info = np.iinfo(series.dtype.numpy_dtype)
+        try:
+            fits = float(value).is_integer() and info.min <= value <= info.max
+        except (TypeError, ValueError):
+            return series
+        if not fits:
+            return series.astype("Float64")
+    return series
+
+
+def fill_missing(df, column, method, value=None):
+    series = df[column]
+    fill = fill_value(series, method, value)
+    result = df.copy(deep=False)
+    result[column] = _able_to_hold(series, fill).fillna(fill)
+    return result, [column]
+
+
+# Methods of impute_missing; all but "value" can also be computed per group
+IMPUTE_METHODS = ("mean", "median", "mode", "value", "ffill", "bfill")
+
+
+def _mode(series):
+    modes = series.mode()
+    return modes.iloc[0] if len(modes) else None
+
+
+def _group_mode(df, column, by):
+    # Most frequent value of column within each group, mapped back onto the rows.
+    # One groupby over (key, value) pairs; ties go to the smallest value, as
+    # with Series.mode(), and groups without any value stay missing.
+    counts = df.groupby([by, column], observed=True).size()
+    top = counts.iloc[np.argsort(-counts.to_numpy(), kind="stable")]
+    keys = top.index.get_level_values(0)
+    top = top[~keys.duplicated()]
+    modes = pd.Series(top.index.get_level_values(1), index=top.index.get_level_values(0))
+    return df[by].map(modes)
+
+
+def _group_fill(df, columns, method, by):
+    # Per-group fill values of several columns
+    if method == "mode":
+        return pd.DataFrame({column: _group_mode(df, column, by) for column in columns}, index=df.index)
+    groups = df.groupby(by, observed=True, sort=False)[columns]
+    if method in ("ffill", "bfill"):
+        return getattr(groups, method)()
+    return groups.transform(method)
+
+
+def _fill(series, fill):
+    # fillna with a scalar or a per-row Series, widening the dtype where needed
+    if isinstance(fill, pd.Series):
+        if pd.api.types.is_integer_dtype(series.dtype) and pd.api.types.is_extension_array_dtype(series.dtype):
+            present = fill.dropna()
+            if len(present) and not (present == present.round()).all():
+                series = series.astype("Float64")
+        return series.fillna(fill)
+    if fill is None or (pd.api.types.is_scalar(fill) and pd.isna(fill)):
+        return series
+    return _able_to_hold(series, fill).fillna(fill)
+
+
+def impute_missing(df, strategies):
+    """Fill missing values of many columns in one step.
+
+    strategies maps a column to {"method": ..., "value": ..., "by": ...}:
+    method is one of IMPUTE_METHODS, value the constant for "value", and by
+    an optional key column whose groups get their own mean, median, mode or
+    forward/backward fill. Statistics are computed once per method (and
+    group key) for all its columns together.
+    """
+    plan = {}
+    for column, strategy in strategies.items():
+        method = strategy["method"]
+        if method not in IMPUTE_METHODS:
+            raise ValueError(f"Unknown imputation method for column '{column}': {method!r}")
+        by = strategy.get("by") if method != "value" else None
+        if method in ("mean", "median") and not pd.api.types.is_numeric_dtype(df[column].dtype):
+            raise ValueError(f"Column '{column}' is not numeric and cannot be filled with the {method}.")
+        plan.setdefault((method, by), []).append(column)
+
+    fills = {}
+    for (method, by), columns in plan.items():
+        if method == "value":
+            fills.update({column: strategies[column].get("value") for column in columns})
+        elif by is not None:
+            grouped = _group_fill(df, columns, method, by)
+            fills.update({column: grouped[column] for column in columns})
+        elif method in ("ffill", "bfill"):
+            filled = getattr(df[columns], method)()
+            fills.update({column: filled[column] for column in columns})
+        elif method == "mode":
+            fills.update({column: _mode(df[column]) for column in columns})
+        else:
+            fills.update(getattr(df[columns], method)().to_dict())
+
+    result = df.copy(deep=False)
+    for column, fill in fills.items():
+        result[column] = _fill(df[column], fill)
+    return result, list(fills)
+
+
+def replace_outliers(df, columns, method, value=None, detection="iqr", threshold=None, approximate=False):
+    # Replace the outliers of several columns in one vectorized step
+    stats = outlier_statistics(df, columns, approximate=approximate)
+    mask = outlier_mask(df, stats, detection, threshold)
+    replacements = pd.Series({column: fill_value(df[column], method, value) for column in columns})
+    values = pd.DataFrame({column: _able_to_hold(df[column], replacements[column]) for column in columns})
+    result = df.copy(deep=False)
+    result[columns] = values.mask(mask, replacements, axis=1)
+    return result, list(columns)
+
+
+# name -> (function, kind). The kind tells the undo log what to snapshot:
+# "values" keeps the changed columns, "rows" the removed rows,
+# "columns" the dropped columns and "names" the previous column names.
+OPERATIONS = {
+    "clean_column_names": (clean_column_names, "names"),
+    "clean_values": (clean_values, "values"),
+    "rename_column": (rename_column, "names"),
+    "convert_dtype": (convert_dtype, "values"),
+    "convert_dtypes": (convert_dtypes, "values"),
+    "drop_duplicates": (drop_duplicates, "rows"),
+    "drop_missing_rows": (drop_missing_rows, "rows"),
+    "drop_columns": (drop_columns, "columns"),
+    "fill_missing": (fill_missing, "values"),
+    "impute_missing": (impute_missing, "values"),
+    "replace_outliers": (replace_outliers, "values"),
+}
+
+
+def apply_step(df, step):
+    """Apply one recipe step, a dict like {"op": "fill_missing", "column": ...}."""
+    params = {key: value for key, value in step.items() if key != "op"}
+    try:
+        function, _ = OPERATIONS[step["op"]]
+    except KeyError:
+        raise ValueError(f"Unknown cleaning operation: {step.get('op')!r}") from None
+    return function(df, **params)
+
+
+def describe_step(step):
+    params = ", ".join(f"{key}={value}" for key, value in step.items() if key != "op")
+    return f"{step['op']}({params})"
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+# Rows multiplied at a time; bounds the float32 temporaries to CHUNK_ROWS x k
+CHUNK_ROWS = 100_000
+# Above this many columns the heatmap is clustered and drawn without numbers
+ANNOTATE_MAX_COLUMNS = 20
+
+
+def _standardized_chunks(values, chunk_rows):
+    # float32 row chunks of the columns in `values` (a list of Series), centred
+    # and scaled so that the float32 products below do not lose precision to
+    # large means. Only one chunk at a time is converted to floats.
+    scales = []
+    for series in values:
+        mean, std = series.mean(), series.std()
+        scales.append((0.0 if pd.isna(mean) else float(mean), 1.0 if pd.isna(std) or std == 0 else float(std)))
+    rows = len(values[0]) if values else 0
+    for start in range(0, rows, chunk_rows):
+        chunk = np.empty((min(chunk_rows, rows - start), len(values)), dtype=np.float32)
+        for position, (series, (mean, std)) in enumerate(zip(values, scales)):
+            part = series.iloc[start:start + chunk_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+            chunk[:, position] = (part - mean) / std
+        yield chunk
+
+
+def _ranks(series):
+    # Average ranks of the non-missing values, centred and kept as float32:
+    # a quarter of the memory of a float64 copy plus its float64 ranks. The
+    # float64 cast is needed because nullable integers rank their NA as values.
+    ranks = series.astype("float64").rank(method="average")
+    return (ranks - ranks.mean()).astype(np.float32)
+
+
+def correlation_matrix(df, columns, method="pearson", chunk_rows=CHUNK_ROWS):
+    """Pairwise-complete Pearson or Spearman correlation of df[columns].
+
+    The sums behind every pairwise correlation are accumulated chunk by chunk
+    with float32 matrix products, so the cost is a handful of BLAS calls per
+    chunk rather than a Python-level loop over column pairs. Returns the
+    correlation matrix and the number of complete rows behind each entry.
+
+    Spearman ranks each column over its non-missing values before
+    correlating; unlike pandas it does not re-rank per pair, which only makes
+    a difference when missing values fall on different rows.
+    """
+    if method == "pearson":
+        values = [df[column] for column in columns]
+    elif method == "spearman":
+        values = [_ranks(df[column]) for column in columns]
+    else:
+        raise ValueError(f"Unknown correlation method: {method!r}")
+
+    k = len(columns)
+    pairs = np.zeros((k, k))
+    sums = np.zeros((k, k))
+    squares = np.zeros((k, k))
+    products = np.zeros((k, k))
+    for chunk in _standardized_chunks(values, chunk_rows):
+        missing = np.isnan(chunk)
+        if not missing.any():
+            # Complete chunk: one matrix product, the rest are column sums
+            pairs += len(chunk)
+            sums += chunk.sum(axis=0, dtype=np.float64)[:, None]
+            squares += (chunk.astype(np.float64) ** 2).sum(axis=0)[:, None]
+            products += chunk.T @ chunk
+            continue
+        present = (~missing).astype(np.float32)
+        filled = np.where(missing, np.float32(0), chunk)
+        pairs += present.T @ present
+        # sums[i, j]: sum of column i over rows where column j is present
+        sums += filled.T @ present
+        squares += (filled * filled).T @ present
+        products += filled.T @ filled
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = products - sums * sums.T / pairs
+        variance = squares - sums ** 2 / pairs
+        corr = covariance / np.sqrt(variance * variance.T)
+    corr[pairs < 2] = np.nan
+    corr = np.clip(corr, -1, 1)
+    np.fill_diagonal(corr, np.where(np.diag(variance) > 0, 1.0, np.nan))
+
+    corr = pd.DataFrame(corr.astype(np.float32), index=columns, columns=columns)
+    counts = pd.DataFrame(pairs.astype(np.int64), index=columns, columns=columns)
+    return corr, counts
+
+
+def top_pairs(corr, counts, k=20):
+    # The k column pairs with the largest absolute correlation
+    upper = np.triu_indices(len(corr), k=1)
+    values = corr.to_numpy()[upper]
+    valid = ~np.isnan(values)
+    order = np.argsort(-np.abs(values[valid]))[:k]
+    rows, cols = upper[0][valid][order], upper[1][valid][order]
+    return pd.DataFrame({
+        "Column 1": corr.index[rows],
+        "Column 2": corr.columns[cols],
+        "Correlation": values[valid][order],
+        "Rows Used": counts.to_numpy()[rows, cols],
+    })
+
+
+def cluster_order(corr):
+    # Column order that puts strongly correlated columns next to each other
+    if len(corr) < 3:
+        return list(corr.columns)
+    distance = 1 - np.abs(np.nan_to_num(corr.to_numpy(dtype=np.float64)))
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0)
+    order = leaves_list(linkage(squareform(distance, checks=False), method="average"))
+    return [corr.columns[i] for i in order]
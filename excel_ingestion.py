@@ -0,0 +1,116 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from export import evict_oldest, write_atomically
+
+try:
+    import pyarrow as pa
+except ImportError:  # Without pyarrow sheets are simply parsed every time
+    pa = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import python_calamine
+except ImportError:  # calamine is optional; pandas then uses openpyxl/xlrd
+    python_calamine = None
+
+# Parsed sheets are kept here as Parquet, named after the workbook's content hash
+SHEET_CACHE_DIR = Path(tempfile.gettempdir()) / "streamlit_app_excel_sheets"
+MAX_CACHED_SHEETS = 32
+
+
+def excel_engine():
+    # calamine (Rust) parses several times faster than openpyxl when installed
+    return "calamine" if python_calamine is not None else None
+
+
+def list_sheets(file, filename):
+    """Names and sizes of the sheets of a workbook, without parsing their cells.
+
+    For .xlsx files openpyxl's read-only mode only reads each sheet's
+    declared dimension; rows and columns are None where a sheet does not
+    declare one, and for .xls files.
+    """
+    file.seek(0)
+    if filename.lower().endswith(".xlsx") and openpyxl is not None:
+        workbook = openpyxl.load_workbook(file, read_only=True, keep_links=False)
+        try:
+            sheets = [
+                {"sheet": sheet.title, "rows": sheet.max_row, "columns": sheet.max_column}
+                for sheet in workbook.worksheets
+            ]
+        finally:
+            workbook.close()
+    else:
+        with pd.ExcelFile(file, engine=excel_engine()) as workbook:
+            sheets = [{"sheet": name, "rows": None, "columns": None} for name in workbook.sheet_names]
+    file.seek(0)
+    return sheets
+
+
+def _sheet_path(file_hash, sheet):
+    sheet_id = hashlib.blake2b(str(sheet).encode(), digest_size=8).hexdigest()
+    return SHEET_CACHE_DIR / f"{file_hash}-{sheet_id}.parquet"
+
+
+def _store_sheet(df, path):
+    # Parquet stores column names as text, so a sheet whose header holds numbers
+    # or dates would read back with different names; such sheets are not cached,
+    # and neither are sheets Parquet cannot hold at all (mixed-type columns).
+    if not all(isinstance(column, str) for column in df.columns):
+        return
+    try:
+        write_atomically(path, lambda partial: df.to_parquet(partial, index=False))
+    except (ValueError, TypeError, pa.ArrowException):
+        pass
+
+
+def read_excel_sheets(file, sheets, file_hash=None):
+    """The chosen sheets of a workbook as {sheet name: DataFrame}.
+
+    With a file_hash, every sheet is looked up in the Parquet sidecar cache
+    first; only missing sheets are parsed, all from one open workbook, and
+    then cached for the next time the same workbook is opened.
+    """
+    frames = {}
+    missing = []
+    use_cache = file_hash is not None and pa is not None
+    if use_cache:
+        SHEET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for sheet in sheets:
+        path = _sheet_path(file_hash, sheet) if use_cache else None
+        if path is not None and path.exists():
+            os.utime(path)
+            frames[sheet] = pd.read_parquet(path)
+        else:
+            missing.append(sheet)
+
+    if missing:
+        file.seek(0)
+        with pd.ExcelFile(file, engine=excel_engine()) as workbook:
+            for sheet in missing:
+                frames[sheet] = workbook.parse(sheet)
+                if use_cache:
+                    _store_sheet(frames[sheet], _sheet_path(file_hash, sheet))
+        file.seek(0)
+        if use_cache:
+            evict_oldest(SHEET_CACHE_DIR, MAX_CACHED_SHEETS)
+    return {sheet: frames[sheet] for sheet in sheets}
+
+
+def combine_sheets(frames):
+    # One sheet is returned as is; several are stacked with a "Sheet" column
+    if len(frames) == 1:
+        return next(iter(frames.values()))
+    return pd.concat(
+        [df.assign(Sheet=sheet)[["Sheet", *df.columns]] for sheet, df in frames.items()],
+        ignore_index=True,
+    )
@@ -0,0 +1,132 @@
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet and Feather exports need pyarrow
+    pa = None
+    pq = None
+
+# Exports are written here and reused while the dataset version is unchanged
+EXPORT_DIR = Path(tempfile.gettempdir()) / "streamlit_app_exports"
+MAX_CACHED_EXPORTS = 8
+# Rows converted to Arrow at a time, so an export never holds a second full copy
+STREAM_ROWS = 250_000
+EXCEL_MAX_ROWS = 1_048_575
+
+# label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet (snappy)": (".parquet", "application/vnd.apache.parquet"),
+    "Parquet (zstd)": (".parquet", "application/vnd.apache.parquet"),
+    "Feather": (".feather", "application/vnd.apache.arrow.file"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _require_pyarrow(export_format):
+    if pa is None:
+        raise ImportError(f"The {export_format} export needs pyarrow: pip install pyarrow")
+
+
+def _arrow_slices(df):
+    # Arrow record batches of at most STREAM_ROWS rows sharing one schema
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for start in range(0, max(len(df), 1), STREAM_ROWS):
+        part = df.iloc[start:start + STREAM_ROWS]
+        yield schema, pa.RecordBatch.from_pandas(part, schema=schema, preserve_index=False)
+
+
+def _write_parquet(df, path, compression):
+    _require_pyarrow("Parquet")
+    writer = None
+    try:
+        for schema, batch in _arrow_slices(df):
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema, compression=compression)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_feather(df, path):
+    _require_pyarrow("Feather")
+    writer = None
+    try:
+        for schema, batch in _arrow_slices(df):
+            if writer is None:
+                options = pa.ipc.IpcWriteOptions(compression="lz4")
+                writer = pa.ipc.new_file(str(path), schema, options=options)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_export(df, export_format, path):
+    if export_format == "CSV":
+        df.to_csv(path, index=False, chunksize=STREAM_ROWS)
+    elif export_format == "CSV (gzip)":
+        df.to_csv(path, index=False, chunksize=STREAM_ROWS, compression="gzip")
+    elif export_format == "Parquet (snappy)":
+        _write_parquet(df, path, "snappy")
+    elif export_format == "Parquet (zstd)":
+        _write_parquet(df, path, "zstd")
+    elif export_format == "Feather":
+        _write_feather(df, path)
+    elif export_format == "Excel":
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} data rows; this dataset has {len(df):,}.")
+        df.to_excel(path, index=False)
+    else:
+        raise ValueError(f"Unknown export format: {export_format!r}")
+
+
+def write_atomically(path, write):
+    """Call write(temporary path), then move the finished file to path.
+
+    The temporary file is created next to path with ".partial" in its name,
+    so other sessions and processes never see a partial file and
+    evict_oldest() leaves it alone; it is removed if write fails.
+    """
+    path = Path(path)
+    handle, partial = tempfile.mkstemp(dir=path.parent, suffix=".partial" + path.suffix)
+    os.close(handle)
+    try:
+        write(partial)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.unlink(partial)
+
+
+def evict_oldest(directory, keep):
+    # Delete all but the `keep` most recently used files of a cache directory
+    files = [file for file in Path(directory).iterdir() if ".partial" not in file.name]
+    files.sort(key=lambda file: file.stat().st_mtime)
+    for file in files[:-keep]:
+        file.unlink(missing_ok=True)
+
+
+def export_path(df, export_format, version):
+    """Path of the dataset written in export_format, building it if needed.
+
+    Files are named after the dataset version, so the same data is only
+    serialized once per format, and are written straight to disk rather than
+    into an in-memory string.
+    """
+    extension, _ = EXPORT_FORMATS[export_format]
+    slug = export_format.split(" ")[-1].strip("()").lower()
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = EXPORT_DIR / f"{version}-{slug}{extension}"
+    if path.exists():
+        os.utime(path)
+        return path
+
+    write_atomically(path, lambda partial: write_export(df, export_format, partial))
+    evict_oldest(EXPORT_DIR, MAX_CACHED_EXPORTS)
+    return path
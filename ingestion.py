@@ -0,0 +1,173 @@
+import io
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the pandas C parser
+    pa = None
+    pa_csv = None
+
+# Rows per chunk for the pandas parser and bytes per block for pyarrow
+CHUNK_ROWS = 200_000
+BLOCK_BYTES = 16 << 20
+
+# A text column becomes 'category' when its distinct values are at most this
+# share of its non-null values (and at most MAX_CATEGORIES of them)
+CATEGORY_RATIO = 0.5
+MAX_CATEGORIES = 10_000
+
+
+def downcast_numeric(series, floats=False):
+    # Smallest integer dtype that holds the values without loss. Floats are
+    # kept unless floats=True: float32 keeps only about 7 significant digits.
+    if pd.api.types.is_bool_dtype(series.dtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+        return series
+    if pd.api.types.is_integer_dtype(series.dtype):
+        if series.dtype.kind == "u":
+            return pd.to_numeric(series, downcast="unsigned")
+        return pd.to_numeric(series, downcast="integer")
+    if floats and pd.api.types.is_float_dtype(series.dtype):
+        return pd.to_numeric(series, downcast="float")
+    return series
+
+
+def should_categorize(series, category_ratio=CATEGORY_RATIO, max_categories=MAX_CATEGORIES):
+    if not (pd.api.types.is_object_dtype(series.dtype) or isinstance(series.dtype, pd.StringDtype)):
+        return False
+    non_null = series.count()
+    if non_null == 0:
+        return False
+    distinct = series.nunique(dropna=True)
+    return distinct <= max_categories and distinct / non_null <= category_ratio
+
+
+def compact_frame(df, category_columns=None, category_ratio=CATEGORY_RATIO, downcast_floats=False):
+    # Downcast numeric columns and turn low-cardinality strings into categories.
+    # category_columns fixes the choice (used to keep chunks consistent).
+    result = {}
+    for column in df.columns:
+        series = df[column]
+        if category_columns is None:
+            categorize = should_categorize(series, category_ratio)
+        else:
+            categorize = column in category_columns and pd.api.types.is_object_dtype(series.dtype)
+        if categorize:
+            result[column] = series.astype("category")
+        else:
+            result[column] = downcast_numeric(series, floats=downcast_floats)
+    return pd.DataFrame(result, index=df.index)
+
+
+def _combine_chunks(chunks, downcast_floats=False):
+    # Column-wise concat so that categorical chunks keep a single categorical
+    # dtype instead of decaying to object when their categories differ
+    if not chunks:
+        return pd.DataFrame()
+    columns = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[column] = pd.Series(union_categoricals(parts, ignore_order=True), name=column)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    df = pd.DataFrame(columns)
+    # Chunks may have been downcast to different widths; narrow once more
+    return compact_frame(df, category_columns=set(), downcast_floats=downcast_floats)
+
+
+def _stream_size(stream):
+    position = stream.tell()
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _limit_bytes(stream, max_bytes):
+    # First max_bytes of the stream, cut back to the last complete line
+    head = stream.read(max_bytes)
+    if len(head) == max_bytes:
+        cut = head.rfind(b"\n")
+        if cut > 0:
+            head = head[:cut + 1]
+    return io.BytesIO(head)
+
+
+def _pyarrow_chunks(stream):
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(block_size=BLOCK_BYTES),
+        # Empty fields are missing values, as with pd.read_csv
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+    )
+    for batch in reader:
+        yield batch.to_pandas(date_as_object=False)
+
+
+def _pandas_chunks(stream):
+    yield from pd.read_csv(stream, chunksize=CHUNK_ROWS)
+
+
+def read_csv_chunked(file, max_rows=None, max_bytes=None, sample_fraction=None, seed=42,
+                     category_ratio=CATEGORY_RATIO, use_pyarrow=True, downcast_floats=False, progress=None):
+    """Read a CSV in chunks into one compact DataFrame.
+
+    Each chunk is downcast and categorized before the next one is parsed, so
+    peak memory stays close to the size of the final frame. max_rows and
+    max_bytes cap how much of the file is read; sample_fraction keeps a
+    reproducible Bernoulli sample (same seed, same rows). Integers are
+    always narrowed without loss; floats only become float32 with
+    downcast_floats, which rounds them to about 7 significant digits.
+    progress, when given, is called as progress(fraction, message).
+    """
+    file.seek(0)
+    stream = _limit_bytes(file, max_bytes) if max_bytes else file
+    total_bytes = max(_stream_size(stream), 1)
+    rng = np.random.default_rng(seed)
+
+    engines = []
+    if use_pyarrow and pa_csv is not None:
+        engines.append(_pyarrow_chunks)
+    engines.append(_pandas_chunks)
+
+    for position, engine in enumerate(engines):
+        stream.seek(0)
+        chunks = []
+        rows_read = 0
+        category_columns = None
+        try:
+            for chunk in engine(stream):
+                if max_rows is not None and rows_read + len(chunk) > max_rows:
+                    chunk = chunk.iloc[:max_rows - rows_read]
+                rows_read += len(chunk)
+                if sample_fraction is not None and sample_fraction < 1:
+                    chunk = chunk[rng.random(len(chunk)) < sample_fraction]
+                if category_columns is None:
+                    # Decide categorical columns once, from the first chunk
+                    category_columns = {
+                        column for column in chunk.columns
+                        if should_categorize(chunk[column], category_ratio)
+                    }
+                chunks.append(compact_frame(chunk.reset_index(drop=True), category_columns,
+                                            downcast_floats=downcast_floats))
+                if progress is not None:
+                    fraction = min(stream.tell() / total_bytes, 1.0)
+                    progress(fraction, f"Read {rows_read:,} rows")
+                if max_rows is not None and rows_read >= max_rows:
+                    break
+        except Exception as error:
+            # pyarrow fixes column types from the first block and fails on a
+            # later mismatch; retry the whole file with the pandas parser
+            if pa is not None and isinstance(error, pa.ArrowInvalid) and position < len(engines) - 1:
+                rng = np.random.default_rng(seed)
+                continue
+            raise
+        break
+
+    if progress is not None:
+        progress(1.0, f"Loaded {rows_read:,} rows")
+    return _combine_chunks(chunks, downcast_floats)
@@ -0,0 +1,119 @@
+import cProfile
+import json
+import logging
+import pstats
+import tempfile
+import time
+from datetime import datetime, timezone
+from io import StringIO
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument is optional; cProfile is always available
+    pyinstrument = None
+
+# Rolling JSON-lines log shared by all sessions of the server process
+LOG_PATH = Path(tempfile.gettempdir()) / "streamlit_app_perf.jsonl"
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+# Functions listed in a cProfile report
+PROFILE_LINES = 40
+
+
+def _perf_logger():
+    logger = logging.getLogger("streamlit_app.perf")
+    if not logger.handlers:
+        handler = RotatingFileHandler(LOG_PATH, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def log_record(record):
+    # Append one record as a JSON line; the file rolls over at MAX_LOG_BYTES
+    _perf_logger().info(json.dumps(record, default=str))
+
+
+def frame_memory(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class RerunTimer:
+    """Wall time of the stages of one script run.
+
+    Stages are laps: lap(name) closes the stage that started at the previous
+    lap (or at creation), so the script only needs one call after each part
+    instead of wrapping it. A disabled timer records nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        self._started = time.perf_counter()
+        self._last = self._started
+        self.stages = []
+
+    def lap(self, stage):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self._started
+
+    def record(self, **extra):
+        return {
+            "type": "rerun",
+            "started_at": self.started_at,
+            "total_s": round(self.total(), 6),
+            "stages": [{"stage": stage, "seconds": round(seconds, 6)} for stage, seconds in self.stages],
+            **extra,
+        }
+
+
+def step_record(description, seconds, before, after):
+    # Timing plus frame size and deep memory around one cleaning step
+    return {
+        "type": "cleaning_step",
+        "step": description,
+        "seconds": round(seconds, 6),
+        "rows_before": len(before),
+        "rows_after": len(after),
+        "memory_before_mb": round(frame_memory(before) / 1024 ** 2, 3),
+        "memory_after_mb": round(frame_memory(after) / 1024 ** 2, 3),
+    }
+
+
+def available_profilers():
+    return ["cProfile"] + (["pyinstrument"] if pyinstrument is not None else [])
+
+
+class RerunProfiler:
+    """cProfile or pyinstrument capture of a single script run, as text."""
+
+    def __init__(self, kind="cProfile"):
+        if kind == "pyinstrument" and pyinstrument is None:
+            raise ImportError("The pyinstrument profiler needs pyinstrument: pip install pyinstrument")
+        self.kind = kind
+        self._profiler = pyinstrument.Profiler() if kind == "pyinstrument" else cProfile.Profile()
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True)
+        self._profiler.disable()
+        buffer = StringIO()
+        pstats.Stats(self._profiler, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        return buffer.getvalue()
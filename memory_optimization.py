@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from ingestion import CATEGORY_RATIO, downcast_numeric, should_categorize
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:  # Without pyarrow text columns can still become categories
+    TEXT_DTYPE = None
+
+# Narrowest first
+NULLABLE_INTEGERS = ("Int8", "Int16", "Int32", "Int64")
+# Suggestions that round values, so they are only applied when chosen
+LOSSY_DTYPES = ("float32",)
+
+
+def _nullable_integer(values):
+    # Smallest nullable integer dtype holding float values that are all whole numbers
+    if len(values) == 0 or not np.all(np.isfinite(values)) or not np.all(values == np.round(values)):
+        return None
+    low, high = values.min(), values.max()
+    for dtype in NULLABLE_INTEGERS:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def suggest_dtype(series, category_ratio=CATEGORY_RATIO):
+    """A smaller dtype for the column, or None when it is already compact.
+
+    Repetitive text becomes 'category' and other text 'string[pyarrow]';
+    floats holding only whole numbers become nullable integers and integers
+    the narrowest width that holds them. Other floats are suggested as
+    float32, the only lossy suggestion (about 7 significant digits).
+    """
+    dtype = series.dtype
+    if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype):
+        if should_categorize(series, category_ratio):
+            return "category"
+        if (TEXT_DTYPE is not None and pd.api.types.is_object_dtype(dtype)
+                and pd.api.types.infer_dtype(series, skipna=True) == "string"):
+            return TEXT_DTYPE
+        return None
+    if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+        return None
+    if dtype.kind == "f":
+        integer = _nullable_integer(series.dropna().to_numpy())
+        if integer is not None:
+            return integer
+    if dtype.kind in "iuf":
+        downcast = downcast_numeric(series, floats=True).dtype
+        return str(downcast) if downcast != dtype else None
+    return None
+
+
+def optimization_report(df, category_ratio=CATEGORY_RATIO):
+    """Deep memory per column now and after converting it to its suggested dtype.
+
+    The sizes after conversion are measured on the converted columns, not
+    estimated; columns without a suggestion keep their size.
+    """
+    rows = []
+    for column in df.columns:
+        series = df[column]
+        before = int(series.memory_usage(index=False, deep=True))
+        suggested = suggest_dtype(series, category_ratio)
+        after = int(series.astype(suggested).memory_usage(index=False, deep=True)) if suggested else before
+        rows.append({"column": column, "dtype": str(series.dtype), "suggested": suggested,
+                     "bytes_before": before, "bytes_after": after})
+    return pd.DataFrame(rows, columns=["column", "dtype", "suggested", "bytes_before", "bytes_after"])
@@ -0,0 +1,79 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# method -> default threshold: IQR multiplier, |z| and |modified z|
+OUTLIER_METHODS = {"iqr": 1.5, "zscore": 3.0, "modified_zscore": 3.5}
+# Rows kept for approximate quantiles; means and standard deviations stay exact
+APPROX_SAMPLE_ROWS = 200_000
+
+
+def _values(df, columns):
+    return df[columns].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def outlier_statistics(df, columns, approximate=False, seed=0):
+    """Per-column statistics every detection method needs, in one pass.
+
+    Quartiles, median and MAD come from a single nanquantile call over all
+    columns. With approximate=True they are taken from a uniform random
+    sample of APPROX_SAMPLE_ROWS rows (a reservoir-style estimate) instead
+    of sorting the full columns.
+    """
+    values = _values(df, columns)
+    sample = values
+    if approximate and len(values) > APPROX_SAMPLE_ROWS:
+        rows = np.random.default_rng(seed).choice(len(values), APPROX_SAMPLE_ROWS, replace=False)
+        sample = values[rows]
+
+    # All-missing columns just get NaN statistics
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        q1, median, q3 = np.nanquantile(sample, [0.25, 0.5, 0.75], axis=0)
+        mad = np.nanmedian(np.abs(sample - median), axis=0)
+
+    return pd.DataFrame(
+        {"mean": mean, "std": std, "q1": q1, "median": median, "q3": q3, "mad": mad},
+        index=columns,
+    )
+
+
+def outlier_bounds(stats, method="iqr", threshold=None):
+    # Every method reduces to a [lower, upper] interval per column
+    threshold = OUTLIER_METHODS[method] if threshold is None else threshold
+    if method == "iqr":
+        iqr = stats["q3"] - stats["q1"]
+        return stats["q1"] - threshold * iqr, stats["q3"] + threshold * iqr
+    if method == "zscore":
+        spread = threshold * stats["std"]
+        return stats["mean"] - spread, stats["mean"] + spread
+    if method == "modified_zscore":
+        # Modified z-score: 0.6745 * (x - median) / MAD
+        spread = threshold * stats["mad"] / 0.6745
+        return stats["median"] - spread, stats["median"] + spread
+    raise ValueError(f"Unknown outlier method: {method!r}")
+
+
+def _mask(values, stats, method, threshold):
+    lower, upper = outlier_bounds(stats, method, threshold)
+    return (values < lower.to_numpy()) | (values > upper.to_numpy())
+
+
+def outlier_mask(df, stats, method="iqr", threshold=None):
+    # Boolean frame, True where a value lies outside its column's bounds
+    columns = list(stats.index)
+    mask = _mask(_values(df, columns), stats, method, threshold)
+    return pd.DataFrame(mask, index=df.index, columns=columns)
+
+
+def outlier_counts(df, stats, thresholds=None):
+    # Number of outliers per column for every method, one column per method
+    thresholds = thresholds or {}
+    values = _values(df, list(stats.index))
+    return pd.DataFrame({
+        method: _mask(values, stats, method, thresholds.get(method)).sum(axis=0)
+        for method in OUTLIER_METHODS
+    }, index=stats.index)
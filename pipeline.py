@@ -0,0 +1,136 @@
+import json
+
+import pandas as pd
+
+from cleaning import OPERATIONS, apply_step, describe_step
+
+RECIPE_VERSION = 1
+
+
+def frame_schema(df):
+    return {str(column): str(dtype) for column, dtype in df.dtypes.items()}
+
+
+def _snapshot(kind, before, after, changed):
+    # Just enough of `before` to rebuild it from `after`
+    snapshot = {"kind": kind, "columns": list(before.columns)}
+    if kind == "values":
+        snapshot["values"] = {column: before[column] for column in changed if column in before.columns}
+    elif kind == "rows":
+        if before.index.is_unique:
+            snapshot["index"] = before.index
+            snapshot["removed"] = before.loc[before.index.difference(after.index, sort=False)]
+        else:
+            snapshot["frame"] = before
+    elif kind == "columns":
+        dropped = [column for column in before.columns if column not in after.columns]
+        snapshot["values"] = {column: before[column] for column in dropped}
+    return snapshot
+
+
+def _restore(snapshot, df):
+    kind = snapshot["kind"]
+    if kind == "names":
+        return df.set_axis(snapshot["columns"], axis=1)
+    if kind == "rows":
+        if "frame" in snapshot:
+            return snapshot["frame"]
+        return pd.concat([df, snapshot["removed"]]).loc[snapshot["index"]]
+    restored = df.copy(deep=False)
+    for column, values in snapshot["values"].items():
+        restored[column] = values
+    return restored[snapshot["columns"]]
+
+
+class CleaningHistory:
+    """Ordered log of cleaning steps with undo/redo.
+
+    Each step is applied exactly once, when it is added. Undo keeps only what
+    the step changed (the old columns, the removed rows or the old names)
+    rather than a copy of the whole frame; redo re-applies the step.
+    """
+
+    def __init__(self, df):
+        self.schema = frame_schema(df)
+        self.steps = []
+        self._undo = []
+        self._redo = []
+
+    def copy(self):
+        # Independent step and undo lists; the recorded snapshots are shared, not copied
+        clone = CleaningHistory.__new__(CleaningHistory)
+        clone.schema = self.schema
+        clone.steps = list(self.steps)
+        clone._undo = list(self._undo)
+        clone._redo = list(self._redo)
+        return clone
+
+    def apply(self, df, step, skip_unchanged=False, _keep_redo=False):
+        after, changed = apply_step(df, step)
+        if skip_unchanged and not changed and len(after) == len(df) and after.columns.equals(df.columns):
+            # The step changed nothing; df is returned and no step is recorded
+            return df
+        self._undo.append(_snapshot(OPERATIONS[step["op"]][1], df, after, changed))
+        self.steps.append(step)
+        if not _keep_redo:
+            self._redo.clear()
+        return after
+
+    def undo(self, df):
+        if not self.steps:
+            return df
+        self._redo.append(self.steps.pop())
+        return _restore(self._undo.pop(), df)
+
+    def redo(self, df):
+        if not self._redo:
+            return df
+        return self.apply(df, self._redo.pop(), _keep_redo=True)
+
+    @property
+    def can_undo(self):
+        return bool(self.steps)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def descriptions(self):
+        return [describe_step(step) for step in self.steps]
+
+    def to_json(self):
+        recipe = {"version": RECIPE_VERSION, "schema": self.schema, "steps": self.steps}
+        return json.dumps(recipe, indent=2, default=str)
+
+
+def load_recipe(text):
+    recipe = json.loads(text)
+    if not isinstance(recipe, dict) or "steps" not in recipe:
+        raise ValueError("Not a cleaning recipe: expected an object with a 'steps' list.")
+    for step in recipe["steps"]:
+        if step.get("op") not in OPERATIONS:
+            raise ValueError(f"Unknown cleaning operation: {step.get('op')!r}")
+    return recipe
+
+
+def schema_mismatches(df, recipe):
+    # Columns the recipe was recorded with that are missing or typed differently
+    expected = recipe.get("schema") or {}
+    actual = frame_schema(df)
+    problems = []
+    for column, dtype in expected.items():
+        if column not in actual:
+            problems.append(f"missing column '{column}'")
+        elif actual[column] != dtype:
+            problems.append(f"column '{column}' is {actual[column]}, recipe expects {dtype}")
+    return problems
+
+
+def replay(df, recipe, history=None):
+    # Apply every step of a recipe in order; returns the frame and its history.
+    # Steps are recorded in a copy of `history`, so when a step fails the
+    # caller's frame and history are both left as they were.
+    history = history.copy() if history is not None else CleaningHistory(df)
+    for step in recipe["steps"]:
+        df = history.apply(df, step)
+    return df, history
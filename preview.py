@@ -0,0 +1,80 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+# Rows per preview page and columns per page of "Detailed Column Information"
+PAGE_SIZES = (25, 100, 500)
+COLUMN_PAGE_SIZE = 20
+
+# Longest symbols first, so ">=" is not read as ">"
+COMPARISONS = {">=": operator.ge, "<=": operator.le, "!=": operator.ne,
+               ">": operator.gt, "<": operator.lt, "=": operator.eq}
+
+
+def _comparison_value(series, text):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return pd.Timestamp(text)
+    return float(text)
+
+
+def filter_mask(series, text):
+    """Rows of series matching a filter typed by the user.
+
+    Numeric and date columns take a value with an optional comparison in
+    front (">= 10", "!=0", "2021-01-01"); any other column matches rows
+    whose text contains the filter, ignoring case.
+    """
+    text = text.strip()
+    compare_values = (pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)) \
+        or pd.api.types.is_datetime64_any_dtype(series.dtype)
+    if not compare_values:
+        return series.astype("string").str.contains(text, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+
+    compare = operator.eq
+    for symbol, function in COMPARISONS.items():
+        if text.startswith(symbol):
+            compare, text = function, text[len(symbol):].strip()
+            break
+    try:
+        value = _comparison_value(series, text)
+    except ValueError:
+        raise ValueError(
+            f"Filter '{text}' is not a valid value for column '{series.name}'; "
+            "use a value, optionally after >, >=, <, <=, = or !="
+        ) from None
+    return compare(series, value).fillna(False).to_numpy(dtype=bool)
+
+
+def preview_rows(df, sort_column=None, ascending=True, filter_column=None, filter_text=""):
+    # Positions of the rows to preview, filtered and in display order;
+    # pages are then cheap iloc slices of these positions
+    positions = np.arange(len(df))
+    if filter_column is not None and filter_text.strip():
+        positions = positions[filter_mask(df[filter_column], filter_text)]
+    if sort_column is not None:
+        values = df[sort_column].iloc[positions].reset_index(drop=True)
+        try:
+            ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+        except TypeError:
+            # Mixed types in one column: fall back to sorting their text
+            ordered = values.astype(str).where(values.notna()).sort_values(
+                ascending=ascending, kind="stable", na_position="last"
+            )
+        positions = positions[ordered.index.to_numpy()]
+    return positions
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
+
+def preview_page(df, positions, page, page_size):
+    # The rows of one page (numbered from 1), with their original index labels
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
+
+
+def matching_columns(df, query):
+    query = query.strip().lower()
+    return [column for column in df.columns if query in str(column).lower()]
@@ -0,0 +1,99 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Quantiles reported for numeric columns (same as DataFrame.describe)
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def frame_fingerprint(df):
+    # Content hash of a DataFrame: column names, dtypes and row values
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+    digest.update(str(df.shape).encode())
+    for column in df.columns:
+        try:
+            hashed = pd.util.hash_pandas_object(df[column], index=False).to_numpy()
+        except TypeError:
+            # Unhashable cell values (lists, dicts ...) are hashed by their text form
+            hashed = pd.util.hash_pandas_object(df[column].astype(str), index=False).to_numpy()
+        digest.update(hashed.tobytes())
+    return digest.hexdigest()
+
+
+def profile_column(series, top_k=5):
+    # Everything the "Data Show" views need for one column, from a single
+    # value_counts pass plus one quantile pass for numeric data
+    counts = series.value_counts(dropna=True, sort=True)
+    # Categoricals also list categories no row uses any more, with a count of 0
+    counts = counts[counts > 0]
+    null_count = int(series.isna().sum())
+    profile = {
+        "dtype": str(series.dtype),
+        "is_numeric": pd.api.types.is_numeric_dtype(series.dtype)
+        and not pd.api.types.is_bool_dtype(series.dtype),
+        "count": int(len(series) - null_count),
+        "null_count": null_count,
+        "unique": int(len(counts)),
+        "top_values": counts.head(top_k),
+        "top": counts.index[0] if len(counts) else None,
+        "freq": int(counts.iloc[0]) if len(counts) else None,
+        "memory": int(series.memory_usage(index=False, deep=True)),
+        "examples": series.head().to_list(),
+    }
+
+    if profile["is_numeric"]:
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if len(values):
+            quantiles = np.quantile(values, PROFILE_QUANTILES)
+            profile.update(
+                min=float(values.min()),
+                max=float(values.max()),
+                mean=float(values.mean()),
+                std=float(values.std(ddof=1)) if len(values) > 1 else np.nan,
+                quantiles=dict(zip(PROFILE_QUANTILES, quantiles.tolist())),
+            )
+        else:
+            profile.update(min=np.nan, max=np.nan, mean=np.nan, std=np.nan,
+                           quantiles=dict.fromkeys(PROFILE_QUANTILES, np.nan))
+    elif pd.api.types.is_datetime64_any_dtype(series.dtype) and profile["count"]:
+        profile.update(min=series.min(), max=series.max())
+
+    return profile
+
+
+def profile_frame(df, top_k=5):
+    # Per-column profiles, keyed by column name in frame order
+    return {column: profile_column(df[column], top_k=top_k) for column in df.columns}
+
+
+def summary_statistics(profile):
+    # Rebuild the DataFrame.describe(include='all') table from a profile
+    rows = {}
+    for column, info in profile.items():
+        row = {"count": info["count"]}
+        if info["is_numeric"]:
+            row.update(mean=info["mean"], std=info["std"], min=info["min"])
+            for q, value in info["quantiles"].items():
+                row[f"{q:.0%}"] = value
+            row["max"] = info["max"]
+        else:
+            row.update(unique=info["unique"], top=info["top"], freq=info["freq"])
+            if "min" in info:
+                row.update(min=info["min"], max=info["max"])
+        rows[column] = row
+
+    order = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    summary = pd.DataFrame(rows)
+    return summary.reindex([name for name in order if name in summary.index])
+
+
+def missing_values(profile):
+    return pd.Series({column: info["null_count"] for column, info in profile.items()}, dtype="int64")
+
+
+def unique_values(profile):
+    return pd.Series({column: info["unique"] for column, info in profile.items()}, dtype="int64")
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Total deep memory of the datasets the store keeps alive at once
+SHARED_MEMORY_BUDGET = 4 * 1024 ** 3
+
+
+def content_hash(file, block_size=16 << 20):
+    # Hash of a file-like object's bytes, read in blocks
+    digest = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    for block in iter(lambda: file.read(block_size), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class SharedDatasetStore:
+    """Process-wide, read-only datasets keyed by content, evicted LRU-first.
+
+    Sessions never modify a stored frame: they work on a shallow copy, and
+    with pandas copy-on-write every column they change becomes a private
+    column while untouched ones keep pointing at the shared data.
+    """
+
+    def __init__(self, memory_budget=SHARED_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._frames = OrderedDict()
+        self._column_bytes = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+        # Parse outside the lock so other sessions are not blocked meanwhile;
+        # two sessions loading the same file at once keep whichever finishes first
+        df = loader()
+        column_bytes = df.memory_usage(deep=True, index=False)
+        with self._lock:
+            if key not in self._frames:
+                self._frames[key] = df
+                self._column_bytes[key] = column_bytes
+                self._evict(keep=key)
+            self._frames.move_to_end(key)
+            return self._frames[key]
+
+    def _evict(self, keep):
+        while self.total_bytes() > self.memory_budget and len(self._frames) > 1:
+            oldest = next(iter(self._frames))
+            if oldest == keep:
+                break
+            del self._frames[oldest]
+            del self._column_bytes[oldest]
+
+    def get(self, key):
+        with self._lock:
+            return self._frames.get(key)
+
+    def column_bytes(self, key):
+        return self._column_bytes.get(key)
+
+    def total_bytes(self):
+        return int(sum(sizes.sum() for sizes in self._column_bytes.values()))
+
+    def __len__(self):
+        return len(self._frames)
+
+
+def _column_buffer(series):
+    values = series.array
+    if isinstance(values, pd.Categorical):
+        return values.codes
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    # Extension arrays (nullable, Arrow) are shared as whole objects
+    return values
+
+
+def shares_data(series, base_series):
+    current, base = _column_buffer(series), _column_buffer(base_series)
+    if isinstance(current, np.ndarray) and isinstance(base, np.ndarray):
+        return np.may_share_memory(current, base)
+    return current is base
+
+
+def memory_report(df, base=None, base_column_bytes=None):
+    """Per-column memory of a session's frame, split into shared and private.
+
+    A column is shared when it still uses the base dataset's data (under any
+    name); everything else, including columns of a row-filtered frame, is
+    private to the session.
+    """
+    rows = []
+    for column in df.columns:
+        series = df[column]
+        source = None
+        if base is not None and len(base) == len(df):
+            candidates = [column] if column in base.columns else []
+            candidates += [name for name in base.columns if name != column and base[name].dtype == series.dtype]
+            source = next((name for name in candidates if shares_data(series, base[name])), None)
+        if source is not None and base_column_bytes is not None:
+            size = int(base_column_bytes[source])
+        else:
+            size = int(series.memory_usage(index=False, deep=True))
+        rows.append({"column": column, "status": "Shared" if source is not None else "Private", "bytes": size})
+    return pd.DataFrame(rows, columns=["column", "status", "bytes"])
@@ -0,0 +1,16 @@
+import string
+
+import pandas as pd
+
+from charts import category_counts
+
+
+def test_category_counts_skip_unused_categories():
+    series = pd.Series(pd.Categorical(["a", "b", "b"], categories=list(string.ascii_lowercase)))
+    assert category_counts(series, top_n=20).to_dict() == {"b": 2, "a": 1}
+
+
+def test_category_counts_sum_the_rest_into_other():
+    series = pd.Series(list("aaabbc") + ["d", "e"])
+    counts = category_counts(series, top_n=2)
+    assert counts.to_dict() == {"a": 3, "b": 2, "Other (3 values)": 3}
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from cleaning import impute_missing
+
+
+def test_group_mode_leaves_all_missing_group_missing():
+    df = pd.DataFrame({"k": ["a", "a", "b", "b"], "x": [1.0, np.nan, np.nan, np.nan]})
+    result, changed = impute_missing(df, {"x": {"method": "mode", "by": "k"}})
+    assert changed == ["x"]
+    assert result["x"].tolist()[:2] == [1.0, 1.0]
+    assert result["x"].iloc[2:].isna().all()
+
+
+def test_group_mode_fills_most_frequent_value_per_group():
+    df = pd.DataFrame({
+        "k": ["a", "a", "a", "b", "b", "b", "b"],
+        "x": ["p", "p", None, "q", "r", "r", None],
+    })
+    result, _ = impute_missing(df, {"x": {"method": "mode", "by": "k"}})
+    assert result["x"].tolist() == ["p", "p", "p", "q", "r", "r", "r"]
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import correlation_matrix, top_pairs
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    rows = 2_000
+    base = rng.normal(size=rows)
+    df = pd.DataFrame({
+        "x": base,
+        "y": base * 0.5 + rng.normal(size=rows),
+        "large_mean": 1e6 + base * 2 + rng.normal(scale=0.1, size=rows),
+        "noise": rng.normal(size=rows),
+        "ints": rng.integers(0, 10, rows),
+        "constant": np.full(rows, 4.0),
+    })
+    # Missing values on different rows in different columns
+    for column, share in [("x", 0.05), ("y", 0.1), ("large_mean", 0.2)]:
+        df.loc[rng.random(rows) < share, column] = np.nan
+    return df
+
+
+def test_pearson_matches_pandas(frame):
+    corr, counts = correlation_matrix(frame, list(frame.columns), "pearson", chunk_rows=300)
+    np.testing.assert_allclose(corr.to_numpy(), frame.corr().to_numpy(), atol=1e-6)
+    present = frame.notna().astype(int)
+    np.testing.assert_array_equal(counts.to_numpy(), (present.T @ present).to_numpy())
+
+
+def test_spearman_matches_pandas(frame):
+    corr, _ = correlation_matrix(frame, list(frame.columns), "spearman", chunk_rows=300)
+    # Each column is ranked once over its own values, then correlated pairwise
+    np.testing.assert_allclose(corr.to_numpy(), frame.rank().corr().to_numpy(), atol=1e-5)
+    complete = frame.dropna()
+    corr, _ = correlation_matrix(complete, list(complete.columns), "spearman", chunk_rows=300)
+    np.testing.assert_allclose(corr.to_numpy(), complete.corr("spearman").to_numpy(), atol=1e-5)
+
+
+def test_constant_column_has_no_correlation(frame):
+    corr, _ = correlation_matrix(frame, list(frame.columns), chunk_rows=300)
+    assert corr["constant"].isna().all()
+
+
+def test_top_pairs_by_absolute_correlation(frame):
+    corr, counts = correlation_matrix(frame, list(frame.columns), chunk_rows=300)
+    pairs = top_pairs(corr, counts, k=3)
+    assert set(pairs.iloc[0][["Column 1", "Column 2"]]) == {"x", "large_mean"}
+    strengths = pairs["Correlation"].abs().to_numpy()
+    assert (np.diff(strengths) <= 0).all()
+    assert pairs["Rows Used"].iloc[0] == counts.loc["x", "large_mean"]
@@ -0,0 +1,24 @@
+import io
+
+import pandas as pd
+import pytest
+
+import excel_ingestion
+from excel_ingestion import read_excel_sheets
+
+pytest.importorskip("pyarrow")
+
+
+def test_cached_sheets_read_back_identical(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_ingestion, "SHEET_CACHE_DIR", tmp_path)
+    workbook = io.BytesIO()
+    with pd.ExcelWriter(workbook) as writer:
+        pd.DataFrame({2021: [1, 2], "a": [3, 4]}).to_excel(writer, sheet_name="years", index=False)
+        pd.DataFrame({"x": [1, 2], "a": [3, 4]}).to_excel(writer, sheet_name="names", index=False)
+
+    parsed = read_excel_sheets(workbook, ["years", "names"], file_hash="book")
+    reopened = read_excel_sheets(workbook, ["years", "names"], file_hash="book")
+    for sheet in parsed:
+        pd.testing.assert_frame_equal(reopened[sheet], parsed[sheet])
+    # Only the sheet with text column names was cached
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingestion
+from ingestion import read_csv_chunked
+
+
+def csv_file(df):
+    return io.BytesIO(df.to_csv(index=False).encode())
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"id": np.arange(1000), "value": rng.normal(size=1000).round(3)})
+
+
+@pytest.mark.parametrize("use_pyarrow", [True, False])
+def test_max_rows(frame, use_pyarrow):
+    df = read_csv_chunked(csv_file(frame), max_rows=123, use_pyarrow=use_pyarrow)
+    assert df["id"].tolist() == list(range(123))
+
+
+@pytest.mark.parametrize("use_pyarrow", [True, False])
+def test_max_bytes_cuts_on_a_line_boundary(frame, use_pyarrow):
+    file = csv_file(frame)
+    lines = file.getvalue().splitlines(keepends=True)
+    max_bytes = len(b"".join(lines[:51])) + 3
+    df = read_csv_chunked(file, max_bytes=max_bytes, use_pyarrow=use_pyarrow)
+    # Header plus 50 complete rows; the partial 51st row is dropped
+    pd.testing.assert_frame_equal(df, ingestion.compact_frame(frame.iloc[:50]), check_dtype=False)
+
+
+def test_seeded_sample_is_the_same_with_both_parsers(frame):
+    with_pyarrow = read_csv_chunked(csv_file(frame), sample_fraction=0.3, seed=7, use_pyarrow=True)
+    with_pandas = read_csv_chunked(csv_file(frame), sample_fraction=0.3, seed=7, use_pyarrow=False)
+    again = read_csv_chunked(csv_file(frame), sample_fraction=0.3, seed=7, use_pyarrow=True)
+    assert 200 < len(with_pyarrow) < 400
+    assert with_pyarrow["id"].tolist() == with_pandas["id"].tolist() == again["id"].tolist()
+
+
+def test_pandas_parser_retries_after_arrow_type_error(monkeypatch):
+    pytest.importorskip("pyarrow")
+    # Small blocks make pyarrow fix "code" as integer before it sees the text
+    monkeypatch.setattr(ingestion, "BLOCK_BYTES", 256)
+    frame = pd.DataFrame({"code": [str(i) for i in range(200)] + ["A1"], "value": range(201)})
+    df = read_csv_chunked(csv_file(frame))
+    assert len(df) == 201
+    assert df["code"].iloc[-1] == "A1"
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import CleaningHistory, replay
+
+
+def test_failed_replay_leaves_history_untouched():
+    df = pd.DataFrame({"a": [1.0, np.nan], "b": [1, 2]})
+    history = CleaningHistory(df)
+    recipe = {"steps": [
+        {"op": "fill_missing", "column": "a", "method": "mean"},
+        {"op": "drop_columns", "columns": ["missing"]},
+    ]}
+    with pytest.raises(KeyError):
+        replay(df, recipe, history)
+    assert history.steps == []
+    assert not history.can_undo
+
+
+def test_replay_returns_frame_and_history_together():
+    df = pd.DataFrame({"a": [1.0, np.nan], "b": [1, 2]})
+    history = CleaningHistory(df)
+    recipe = {"steps": [{"op": "fill_missing", "column": "a", "method": "mean"}]}
+    result, replayed = replay(df, recipe, history)
+    assert result["a"].tolist() == [1.0, 1.0]
+    assert len(replayed.steps) == 1 and history.steps == []
+    assert replayed.undo(result).equals(df)
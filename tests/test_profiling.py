@@ -0,0 +1,11 @@
+import pandas as pd
+
+from profiling import profile_column
+
+
+def test_unused_categories_are_not_profiled():
+    series = pd.Series(pd.Categorical(["a", "b", "a"], categories=["a", "b", "c"]))
+    profile = profile_column(series)
+    assert profile["unique"] == series.nunique() == 2
+    assert profile["top_values"].to_dict() == {"a": 2, "b": 1}
+    assert (profile["top"], profile["freq"]) == ("a", 2)
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from type_inference import clean_values
+
+
+def test_datetime_format_comes_from_the_sample():
+    # More rows than the sample, whose first string is a date rather than "n/a"
+    dates = pd.Series(pd.date_range("2000-01-01", periods=20_000, freq="h").strftime("%Y/%m/%d %H:%M"), dtype=object)
+    dates.iloc[0] = "n/a"
+    result, conversions = clean_values(pd.DataFrame({"d": dates}))
+    assert conversions == {"d": "datetime"}
+    assert result["d"].isna().sum() == 1
+
+
+def test_clean_values_is_idempotent():
+    df = pd.DataFrame({"t": [f"Item {i}" for i in range(100)], "u": [f"x{i}" for i in range(100)]})
+    once, conversions = clean_values(df)
+    assert conversions == {"t": "text"}
+    twice, conversions = clean_values(once)
+    assert conversions == {}
+    pd.testing.assert_frame_equal(twice, once)
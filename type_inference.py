@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from ingestion import should_categorize
+
+# Rows inspected per column before deciding its type
+SAMPLE_SIZE = 10_000
+# Share of sampled values that must parse for a numeric/datetime conversion
+NUMERIC_THRESHOLD = 0.7
+
+BOOLEAN_VALUES = {"true": True, "false": False, "yes": True, "no": False}
+
+
+def _sample(series, sample_size, seed):
+    if len(series) <= sample_size:
+        return series
+    return series.sample(sample_size, random_state=seed)
+
+
+def _as_text(series):
+    # Categorical columns are inspected through their values as plain strings
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object)
+    return series
+
+
+def infer_column_type(series, sample_size=SAMPLE_SIZE, numeric_threshold=NUMERIC_THRESHOLD, seed=0):
+    """Decide how a text or categorical column should be stored.
+
+    Returns 'numeric', 'datetime', 'boolean', 'categorical' or 'text', or
+    None when the column already has a typed dtype and needs no work. The
+    decision is made on a random sample of at most sample_size values;
+    missing values count as non-matching, as they did in the app.
+    """
+    return _infer_column_type(series, sample_size, numeric_threshold, seed)[0]
+
+
+def _infer_column_type(series, sample_size, numeric_threshold, seed):
+    # The decided kind plus, for 'datetime', the format the sample parsed with
+    is_categorical = isinstance(series.dtype, pd.CategoricalDtype)
+    is_text = pd.api.types.is_object_dtype(series.dtype) or isinstance(series.dtype, pd.StringDtype)
+    if not (is_categorical or is_text):
+        return None, None
+    if len(series) == 0:
+        return "text", None
+
+    sample = _as_text(_sample(series, sample_size, seed))
+
+    if pd.to_numeric(sample, errors="coerce").notna().mean() > numeric_threshold:
+        return "numeric", None
+
+    non_null = sample.dropna()
+    strings = non_null[non_null.map(type) == str]
+    if len(strings) == 0:
+        return ("categorical" if is_categorical else "text"), None
+
+    date_format = guess_datetime_format(strings.iloc[0])
+    if date_format is not None:
+        parsed = pd.to_datetime(sample, format=date_format, errors="coerce")
+        if parsed.notna().mean() > numeric_threshold:
+            return "datetime", date_format
+
+    if len(strings) == len(non_null) and strings.str.strip().str.lower().isin(BOOLEAN_VALUES).all():
+        return "boolean", None
+
+    if is_categorical or should_categorize(sample):
+        return "categorical", None
+    return "text", None
+
+
+def _lower_categories(series):
+    categories = series.cat.categories
+    if categories.dtype != object and not isinstance(categories.dtype, pd.StringDtype):
+        return series
+    lowered = categories.str.lower()
+    if lowered.equals(categories):
+        return series
+    if lowered.is_unique:
+        return series.cat.rename_categories(lowered)
+    # Lowercasing merges some categories ('A' and 'a'); rebuild them
+    return series.str.lower().astype("category")
+
+
+def convert_column(series, kind, date_format=None):
+    # One vectorized conversion for the decided kind; returns series itself
+    # when the conversion would change nothing
+    if kind == "numeric":
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Parse each category once and look the values up by code
+            lookup = pd.to_numeric(series.cat.categories.astype(object), errors="coerce")
+            lookup = np.append(np.asarray(lookup, dtype="float64"), np.nan)
+            return pd.Series(lookup[series.cat.codes.to_numpy()], index=series.index, name=series.name)
+        return pd.to_numeric(series, errors="coerce")
+
+    if kind == "datetime":
+        if date_format is None:
+            first = _as_text(series).dropna()
+            date_format = guess_datetime_format(first[first.map(type) == str].iloc[0])
+        return pd.to_datetime(_as_text(series), format=date_format, errors="coerce")
+
+    if kind == "boolean":
+        return _as_text(series).str.strip().str.lower().map(BOOLEAN_VALUES).astype("boolean")
+
+    if kind == "categorical":
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype("category")
+        return _lower_categories(series)
+
+    if kind == "text":
+        lowered = series.str.lower()
+        return series if lowered.equals(series) else lowered
+
+    return series
+
+
+def clean_values(df, sample_size=SAMPLE_SIZE, numeric_threshold=NUMERIC_THRESHOLD, seed=0):
+    """Infer and convert the type of every text/categorical column.
+
+    Returns the new frame and a {column: kind} dict of the conversions made.
+    Columns that already have a typed dtype, or text that is already
+    lowercase, are left untouched, so running this again on its own output
+    changes nothing.
+    """
+    conversions = {}
+    result = df.copy(deep=False)
+    for column in df.columns:
+        series = df[column]
+        kind, date_format = _infer_column_type(series, sample_size, numeric_threshold, seed)
+        if kind is None:
+            continue
+        converted = convert_column(series, kind, date_format)
+        if converted is not series:
+            result[column] = converted
+            conversions[column] = kind
+    return result, conversions